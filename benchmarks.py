@@ -0,0 +1,262 @@
+"""
+Benchmarks de los caminos calientes del simulador.
+
+    python benchmarks.py correr --salida base.json
+    python benchmarks.py comparar base.json nuevo.json --umbral 0.10
+    python benchmarks.py guardia --max-us 5
+    python benchmarks.py motores
+
+`correr` mide, para cada variante y λ, los minutos simulados por segundo (mejor
+de --repeticiones corridas) y el pico de memoria de una corrida (tracemalloc),
+con historial completo y apagado, más el tiempo de dibujar los cuadros de las
+animaciones. `comparar` marca como regresión toda medición más lenta (o con más
+memoria) que la base en más de --umbral, y sale con código 1 si hay alguna.
+`guardia` no necesita base: mide el costo fijo de cada minuto (cielo vacío y poco
+tráfico, donde lo que pesa es el trabajo por minuto y no por avión) y sale con
+código 1 si alguno pasa de --max-us microsegundos por minuto. `motores` muestra
+cuánto más rápido que Simulador corre cada motor de SimuladorVectorizado.
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+import numpy as np
+
+import main
+from main import Simulador, SimuladorViento, SimuladorTormenta, Simulador_con_reintentos
+from motor_vectorizado import SimuladorVectorizado
+from paralelo import sin_consola
+
+
+LAMBDAS = (0.02, 0.1, 0.2, 0.5, 1.0)
+VARIANTES = {
+    "normal": (Simulador, {}),
+    "viento": (SimuladorViento, {}),
+    "tormenta": (SimuladorTormenta, {"t_inicio": 600, "duracion": 30}),
+    "reintentos": (Simulador_con_reintentos, {}),
+    "vectorizado": (SimuladorVectorizado, {}),
+    "vectorizado_numpy": (SimuladorVectorizado, {"engine": "numpy"}),
+}
+MOTORES_VECTORIZADOS = ("vectorizado", "vectorizado_numpy")
+REGISTROS = ("completo", "off")
+
+
+def _correr_dia(clase, kwargs: dict, lam: float, minutos: int, nivel_registro: str, seed=42):
+    with sin_consola():   # no interesa medir la consola
+        sim = clase(seed=seed, nivel_registro=nivel_registro, **kwargs)
+        sim.simular_dia(lam, minutos=minutos)
+    return sim
+
+
+def medir_dia(clase, kwargs: dict, lam: float, minutos: int, nivel_registro: str, repeticiones: int) -> dict:
+    """Minutos por segundo (mejor de repeticiones) y pico de memoria de un día."""
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        _correr_dia(clase, kwargs, lam, minutos, nivel_registro)
+        tiempos.append(time.perf_counter() - inicio)
+
+    tracemalloc.start()
+    _correr_dia(clase, kwargs, lam, minutos, nivel_registro)
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    segundos = min(tiempos)
+    return {"segundos": segundos, "ticks_por_s": minutos / segundos, "pico_mb": pico / 2**20}
+
+
+def medir_animacion(funcion, sim, repeticiones: int) -> dict:
+    """
+    Tiempo de armar la matriz y dibujar todos los cuadros de una animación. Los
+    cuadros se consumen sin pasar por ffmpeg, así la medición no depende del codec.
+    """
+    original = main.grabar_video
+    cuadros = []
+    main.grabar_video = lambda generador, ruta, fps: cuadros.append(sum(1 for _ in generador))
+    try:
+        tiempos = []
+        for _ in range(repeticiones):
+            inicio = time.perf_counter()
+            funcion(sim, "benchmark")
+            tiempos.append(time.perf_counter() - inicio)
+    finally:
+        main.grabar_video = original
+    segundos = min(tiempos)
+    return {"segundos": segundos, "cuadros_por_s": cuadros[-1] / segundos}
+
+
+def correr_suite(lambdas=LAMBDAS, variantes=None, minutos=18*60, repeticiones=3,
+                 lam_animacion=0.1) -> dict:
+    variantes = variantes or list(VARIANTES)
+    resultados = {}
+    for nombre in variantes:
+        clase, kwargs = VARIANTES[nombre]
+        for lam in lambdas:
+            for registro in REGISTROS:
+                clave = f"{nombre}/lam={lam}/registro={registro}"
+                resultados[clave] = medir_dia(clase, kwargs, lam, minutos, registro, repeticiones)
+                print(f"{clave:<45} {resultados[clave]['ticks_por_s']:>10.0f} min/s "
+                      f"{resultados[clave]['pico_mb']:>8.2f} MB", flush=True)
+
+    sim = _correr_dia(SimuladorTormenta, VARIANTES["tormenta"][1], lam_animacion, minutos, "completo")
+    for funcion in (main.animate_simulation, main.animate_simulation_aviones):
+        clave = f"animacion/{funcion.__name__}/lam={lam_animacion}"
+        resultados[clave] = medir_animacion(funcion, sim, max(1, repeticiones // 2))
+        print(f"{clave:<45} {resultados[clave]['cuadros_por_s']:>10.0f} cuadros/s", flush=True)
+
+    return {"meta": metadatos(minutos, repeticiones), "resultados": resultados}
+
+
+def metadatos(minutos: int, repeticiones: int) -> dict:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                                text=True, cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except OSError:
+        commit = ""
+    return {
+        "fecha": datetime.now().isoformat(timespec="seconds"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "maquina": platform.platform(),
+        "minutos": minutos,
+        "repeticiones": repeticiones,
+    }
+
+
+# ======================
+# Comparación contra una base
+# ======================
+# (métrica, True si más grande es mejor)
+METRICAS = (("ticks_por_s", True), ("cuadros_por_s", True), ("pico_mb", False))
+
+
+def comparar(base: dict, nuevo: dict, umbral=0.10) -> list:
+    """
+    Filas (clave, métrica, base, nuevo, cociente nuevo/base, es_regresion) para las
+    mediciones presentes en los dos archivos. Es regresión si la velocidad baja o la
+    memoria sube más de umbral (fracción).
+    """
+    filas = []
+    for clave, medidas in base["resultados"].items():
+        if clave not in nuevo["resultados"]:
+            continue
+        for metrica, mas_es_mejor in METRICAS:
+            if metrica not in medidas:
+                continue
+            b, n = medidas[metrica], nuevo["resultados"][clave][metrica]
+            cociente = n / b if b > 0 else float("inf")
+            regresion = cociente < 1 - umbral if mas_es_mejor else cociente > 1 + umbral
+            filas.append((clave, metrica, b, n, cociente, regresion))
+    return filas
+
+
+# ======================
+# Guardia del costo por minuto
+# ======================
+# con λ bajo casi no hay aviones: cualquier llamada a NumPy por minuto (unos µs) se nota
+GUARDIA_LAMBDAS = (0.0, 0.02)
+
+
+def costo_por_minuto(lambdas=GUARDIA_LAMBDAS, minutos=18*60, repeticiones=20) -> dict:
+    """{clave: µs por minuto simulado} del Simulador normal, con registro completo y apagado."""
+    costos = {}
+    for lam in lambdas:
+        for registro in REGISTROS:
+            medida = medir_dia(Simulador, {}, lam, minutos, registro, repeticiones)
+            costos[f"normal/lam={lam}/registro={registro}"] = medida["segundos"] / minutos * 1e6
+    return costos
+
+
+def guardia(max_us=5.0, **kwargs) -> list:
+    """Filas (clave, µs por minuto, excede) de costo_por_minuto contra el tope max_us."""
+    return [(clave, us, us > max_us) for clave, us in costo_por_minuto(**kwargs).items()]
+
+
+# ======================
+# Motores vectorizados contra Simulador
+# ======================
+def aceleracion_motores(lambdas=LAMBDAS, minutos=18*60, repeticiones=3) -> list:
+    """
+    Filas (variante, λ, registro, segundos de Simulador, segundos de la variante,
+    aceleración) para cada motor de MOTORES_VECTORIZADOS. Aceleración > 1: la
+    variante es más rápida que Simulador.
+    """
+    filas = []
+    for lam in lambdas:
+        for registro in REGISTROS:
+            base = medir_dia(Simulador, {}, lam, minutos, registro, repeticiones)["segundos"]
+            for nombre in MOTORES_VECTORIZADOS:
+                clase, kwargs = VARIANTES[nombre]
+                _correr_dia(clase, kwargs, lam, minutos, registro)   # compila el núcleo jit fuera de la medición
+                segundos = medir_dia(clase, kwargs, lam, minutos, registro, repeticiones)["segundos"]
+                filas.append((nombre, lam, registro, base, segundos, base / segundos))
+    return filas
+
+
+def _principal(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="comando", required=True)
+
+    p_correr = sub.add_parser("correr", help="corre la suite y guarda el JSON")
+    p_correr.add_argument("--salida", default="benchmark.json")
+    p_correr.add_argument("--repeticiones", type=int, default=3)
+    p_correr.add_argument("--minutos", type=int, default=18*60)
+    p_correr.add_argument("--lambdas", type=float, nargs="+", default=list(LAMBDAS))
+    p_correr.add_argument("--variantes", nargs="+", choices=list(VARIANTES), default=None)
+
+    p_comparar = sub.add_parser("comparar", help="compara dos JSON y marca regresiones")
+    p_comparar.add_argument("base")
+    p_comparar.add_argument("nuevo")
+    p_comparar.add_argument("--umbral", type=float, default=0.10)
+
+    p_guardia = sub.add_parser("guardia", help="falla si el costo fijo por minuto pasa de --max-us")
+    p_guardia.add_argument("--max-us", type=float, default=5.0)
+    p_guardia.add_argument("--repeticiones", type=int, default=20)
+
+    p_motores = sub.add_parser("motores", help="aceleración de SimuladorVectorizado contra Simulador")
+    p_motores.add_argument("--repeticiones", type=int, default=3)
+    p_motores.add_argument("--lambdas", type=float, nargs="+", default=list(LAMBDAS))
+
+    args = parser.parse_args(argv)
+    if args.comando == "motores":
+        for nombre, lam, registro, base, segundos, aceleracion in aceleracion_motores(
+                args.lambdas, repeticiones=args.repeticiones):
+            print(f"{nombre:<18} lam={lam:<5} registro={registro:<9} "
+                  f"{base * 1000:>8.1f} ms -> {segundos * 1000:>8.1f} ms {aceleracion:>6.2f}x")
+        return 0
+    if args.comando == "guardia":
+        filas = guardia(args.max_us, repeticiones=args.repeticiones)
+        for clave, us, excede in filas:
+            print(f"{clave:<45} {us:>8.2f} µs/minuto {'EXCEDE' if excede else ''}")
+        excesos = sum(fila[-1] for fila in filas)
+        print(f"{excesos} de {len(filas)} mediciones pasan de {args.max_us:.1f} µs/minuto")
+        return 1 if excesos else 0
+    if args.comando == "correr":
+        datos = correr_suite(args.lambdas, args.variantes, args.minutos, args.repeticiones)
+        with open(args.salida, "w", encoding="utf-8") as f:
+            json.dump(datos, f, indent=2)
+        print(f"guardado en {args.salida}")
+        return 0
+
+    with open(args.base, encoding="utf-8") as f:
+        base = json.load(f)
+    with open(args.nuevo, encoding="utf-8") as f:
+        nuevo = json.load(f)
+    filas = comparar(base, nuevo, args.umbral)
+    for clave, metrica, b, n, cociente, regresion in filas:
+        marca = "REGRESIÓN" if regresion else ""
+        print(f"{clave:<45} {metrica:<14} {b:>12.2f} {n:>12.2f} {cociente:>7.2f}x {marca}")
+    regresiones = sum(fila[-1] for fila in filas)
+    print(f"{regresiones} regresiones de {len(filas)} mediciones (umbral {args.umbral:.0%})")
+    return 1 if regresiones else 0
+
+
+if __name__ == "__main__":
+    sys.exit(_principal())
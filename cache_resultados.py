@@ -0,0 +1,159 @@
+import hashlib
+import inspect
+import json
+import os
+
+import numpy as np
+
+import main
+
+
+# Archivos cuyo contenido define la versión del código de simulación
+# (montecarlo define CAMPOS_RESUMEN y resumen_replica: la forma de las filas guardadas)
+MODULOS_SIMULACION = ("main", "motor_vectorizado", "escenarios", "nucleo_jit", "montecarlo")
+
+
+def _canonico(obj):
+    """Descripción JSON estable de un valor de configuración (sin direcciones de memoria)."""
+    if obj is None or isinstance(obj, (bool, int, float, str)):
+        return obj
+    if isinstance(obj, (np.integer, np.floating, np.bool_)):
+        return obj.item()
+    if isinstance(obj, np.ndarray):
+        return {"ndarray": obj.tolist(), "dtype": str(obj.dtype)}
+    if isinstance(obj, (list, tuple)):
+        return [_canonico(x) for x in obj]
+    if isinstance(obj, dict):
+        return {str(k): _canonico(v) for k, v in sorted(obj.items(), key=lambda kv: str(kv[0]))}
+    if isinstance(obj, np.random.SeedSequence):
+        return {"SeedSequence": [_canonico(obj.entropy), list(obj.spawn_key), obj.pool_size]}
+    if inspect.isclass(obj) or inspect.isfunction(obj):
+        return f"{obj.__module__}.{obj.__qualname__}"
+    if hasattr(obj, "__dict__"):
+        return {type(obj).__qualname__: _canonico(vars(obj))}
+    raise TypeError(f"no se puede usar {type(obj).__name__} como parte de la clave del cache")
+
+
+def _huella_bytecode(codigo) -> bytes:
+    """Bytecode, nombres y constantes de un code object (y de los anidados)."""
+    partes = [codigo.co_code, repr(codigo.co_names).encode(), repr(codigo.co_varnames).encode()]
+    for const in codigo.co_consts:
+        partes.append(_huella_bytecode(const) if inspect.iscode(const) else repr(const).encode())
+    return b"\0".join(partes)
+
+
+def _huella_clase(clase) -> bytes:
+    """
+    Código de una clase propia. Si no hay fuente (clase definida en un notebook o en
+    __main__), el bytecode y las constantes de sus métodos y sus atributos de clase.
+    """
+    try:
+        return inspect.getsource(clase).encode()
+    except (OSError, TypeError):
+        pass
+    partes = [clase.__qualname__.encode()]
+    for nombre, valor in sorted(vars(clase).items()):
+        funcion = valor.fget if isinstance(valor, property) else getattr(valor, "__func__", valor)
+        if inspect.isfunction(funcion):
+            partes.append(nombre.encode() + _huella_bytecode(funcion.__code__)
+                          + repr(funcion.__defaults__).encode())
+        elif not nombre.startswith("__"):
+            try:
+                partes.append(nombre.encode() + json.dumps(_canonico(valor)).encode())
+            except TypeError:
+                partes.append(nombre.encode() + type(valor).__qualname__.encode())
+    return b"\0".join(partes)
+
+
+def version_codigo(clase) -> str:
+    """
+    Hash del código fuente de los módulos de simulación y de las clases propias de
+    la jerarquía de clase (las definidas fuera de esos módulos, ver _huella_clase).
+    """
+    h = hashlib.sha256()
+    carpeta = os.path.dirname(os.path.abspath(main.__file__))
+    for nombre in MODULOS_SIMULACION:
+        ruta = os.path.join(carpeta, f"{nombre}.py")
+        if os.path.exists(ruta):
+            with open(ruta, "rb") as f:
+                h.update(nombre.encode() + b"\0" + f.read())
+    for base in clase.__mro__:
+        if base.__module__ not in MODULOS_SIMULACION and base.__module__ != "builtins":
+            # clase definida en un script o notebook: también cuenta su código
+            h.update(f"{base.__module__}.{base.__qualname__}".encode() + b"\0" + _huella_clase(base))
+    return h.hexdigest()
+
+
+class CacheResultados:
+    """
+    Cache en disco de los resúmenes por réplica (CAMPOS_RESUMEN), direccionado por
+    contenido.
+
+    - La clave es un hash de la configuración completa (clase, kwargs, λ, semilla
+      raíz, minutos), de las constantes de main (MIN_SEPARACION, ...) y de la
+      versión del código: cambiar cualquiera de ellas da otra entrada.
+    - Cada entrada guarda las réplicas 0..k-1 como una matriz (k × campos). Como las
+      semillas salen de SeedSequence(seed).spawn, la réplica r usa la misma semilla
+      para cualquier n_rep: al pedir más réplicas solo se corren las que faltan.
+    - Al superar max_bytes se borran las entradas usadas hace más tiempo (LRU por
+      fecha de modificación, que se actualiza en cada lectura).
+    """
+
+    def __init__(self, directorio=".cache_aep", max_bytes=256 * 2**20):
+        self.directorio = directorio
+        self.max_bytes = max_bytes
+        os.makedirs(directorio, exist_ok=True)
+
+    def clave(self, clase, kwargs: dict, lam: float, seed, minutos: int) -> str:
+        config = {
+            "clase": _canonico(clase),
+            "kwargs": _canonico(kwargs),
+            "lam": float(lam),
+            "seed": _canonico(seed),
+            "minutos": int(minutos),
+            "constantes": {nombre: getattr(main, nombre)
+                           for nombre in ("RADAR_DIST", "MIN_SEPARACION", "VEL_RETROCESO")},
+            "codigo": version_codigo(clase),
+        }
+        texto = json.dumps(config, sort_keys=True)
+        return hashlib.sha256(texto.encode()).hexdigest()
+
+    def _ruta(self, clave: str) -> str:
+        return os.path.join(self.directorio, f"{clave}.npy")
+
+    def leer(self, clave: str) -> np.ndarray | None:
+        """Resúmenes guardados (k × campos) o None si la entrada no existe."""
+        ruta = self._ruta(clave)
+        try:
+            resumenes = np.load(ruta)
+        except (FileNotFoundError, ValueError, OSError):
+            return None
+        os.utime(ruta)
+        return resumenes
+
+    def guardar(self, clave: str, resumenes: np.ndarray):
+        ruta = self._ruta(clave)
+        temporal = f"{ruta}.{os.getpid()}.tmp"
+        with open(temporal, "wb") as f:
+            np.save(f, np.asarray(resumenes, dtype=float))
+        os.replace(temporal, ruta)   # atómico: otro proceso nunca lee un archivo a medias
+        self.podar()
+
+    def podar(self):
+        """Borra las entradas menos usadas hasta quedar por debajo de max_bytes."""
+        entradas = []
+        for nombre in os.listdir(self.directorio):
+            if nombre.endswith(".npy"):
+                info = os.stat(os.path.join(self.directorio, nombre))
+                entradas.append((info.st_mtime, info.st_size, nombre))
+        total = sum(tam for _, tam, _ in entradas)
+        for _, tam, nombre in sorted(entradas):
+            if total <= self.max_bytes:
+                break
+            os.remove(os.path.join(self.directorio, nombre))
+            total -= tam
+
+    def limpiar(self):
+        for nombre in os.listdir(self.directorio):
+            if nombre.endswith(".npy"):
+                os.remove(os.path.join(self.directorio, nombre))
@@ -0,0 +1,256 @@
+from main import (
+    EstadoAvion,
+    Simulador,
+    ColaAproximacion,
+    volar_exacto,
+    vel_maxima_permitida_por_tramo,
+    velocidad_minima_permitida_por_tramo,
+    RADAR_DIST,
+    MIN_SEPARACION,
+    VEL_RETROCESO,
+)
+
+
+# ======================
+# Estados (miembros del IntEnum como globales: el loop no paga el acceso al enum)
+# ======================
+APROXIMANDO = EstadoAvion.APROXIMANDO
+AJUSTANDO = EstadoAvion.AJUSTANDO
+REGRESANDO = EstadoAvion.REGRESANDO
+REGRESANDO_VIENTO = EstadoAvion.REGRESANDO_VIENTO
+REGRESANDO_TORMENTA = EstadoAvion.REGRESANDO_TORMENTA
+ACERCANDOSE = EstadoAvion.ACERCANDOSE
+DESVIADO = EstadoAvion.DESVIADO
+ATERRIZADO = EstadoAvion.ATERRIZADO
+
+REGRESANDO_ALGUNO = (REGRESANDO, REGRESANDO_VIENTO, REGRESANDO_TORMENTA)
+FINALES = (ATERRIZADO, DESVIADO)
+
+VEL_GO_AROUND = 200   # kts al abortar el aterrizaje
+DIST_GO_AROUND = 5    # reingresa a 5 mn
+
+
+# ======================
+# Avión del motor de escenarios
+# ======================
+class AvionEscenario:
+    __slots__ = ("id", "distancia", "velocidad", "estado", "tiempo_llegada",
+                 "retraso", "t_aterrizaje", "intentos", "t_toque")
+
+    def __init__(self, id_avion, minuto_actual):
+        self.id = id_avion
+        self.distancia = 100.0
+        self.velocidad = 0.0
+        self.estado = APROXIMANDO
+        self.tiempo_llegada = minuto_actual
+        self.retraso = 0
+        self.t_aterrizaje = None
+        self.intentos = 0
+
+    def __repr__(self):
+        return (f" Avión {self.id}\n"
+                f" - Distancia: {self.distancia:.1f} mn\n"
+                f" - Velocidad: {self.velocidad:.0f} kts\n"
+                f" - Estado: {self.estado.name}")
+
+
+# ======================
+# Política de separación
+# ======================
+class PoliticaSeparacion:
+    """
+    Regla de Avion.controlar_aproximacion con sus constantes como parámetros.
+    Por ejemplo, la propuesta 2 de ej7parte2 es PoliticaSeparacion(min_separacion=2).
+    tramos: TramosVelocidad con las bandas de velocidad (None = las de siempre, con
+    vel_maxima_permitida_por_tramo y velocidad_minima_permitida_por_tramo, que son
+    más rápidas que recorrer los tramos).
+    """
+
+    def __init__(self, min_separacion=MIN_SEPARACION, reduccion=20, vel_retroceso=VEL_RETROCESO,
+                 tramos=None):
+        self.min_separacion = min_separacion
+        self.reduccion = reduccion
+        self.vel_retroceso = vel_retroceso
+        self.tramos = tramos
+
+    def controlar(self, avion, dist: float, vel_lider, dist_lider: float):
+        """
+        Decide estado y velocidad de avion; dist y dist_lider son las del comienzo del
+        minuto y vel_lider la que el control le dio al líder este minuto (None: sin líder).
+        """
+        tramos = self.tramos
+        if vel_lider is None:
+            avion.estado = APROXIMANDO
+            avion.velocidad = vel_maxima_permitida_por_tramo(dist) if tramos is None else tramos.maxima(dist)
+            return
+
+        if avion.velocidad <= 0:
+            separacion = float("inf")
+        else:
+            separacion = ((dist - dist_lider) / avion.velocidad) * 60
+        if separacion < self.min_separacion:
+            nueva_vel = vel_lider - self.reduccion
+            vel_minima = velocidad_minima_permitida_por_tramo(dist) if tramos is None else tramos.minima(dist)
+            if nueva_vel < vel_minima:
+                avion.estado = REGRESANDO
+                avion.velocidad = self.vel_retroceso
+            else:
+                avion.estado = AJUSTANDO
+                avion.velocidad = nueva_vel
+        else:
+            avion.estado = APROXIMANDO
+            avion.velocidad = vel_maxima_permitida_por_tramo(dist) if tramos is None else tramos.maxima(dist)
+
+
+# ======================
+# Componentes (perturbaciones y reglas que se combinan)
+# ======================
+class Componente:
+    """Base de los componentes: cada gancho devuelve un nuevo estado, o None si no interviene."""
+
+    def al_tocar_pista(self, sim, avion, minuto: int):
+        """Avión que llega a la pista: un estado REGRESANDO_* fuerza un go-around."""
+        return None
+
+    def al_salir_del_radar(self, sim, avion):
+        """Avión que regresa y pasa RADAR_DIST: por defecto se desvía."""
+        return None
+
+
+class Viento(Componente):
+    """Go-around por viento con probabilidad prob en cada intento de aterrizaje (usa sim.rng_viento)."""
+
+    def __init__(self, prob=0.1):
+        self.prob = prob
+
+    def al_tocar_pista(self, sim, avion, minuto):
+        if sim.rng_viento.random() < self.prob:
+            return REGRESANDO_VIENTO
+        return None
+
+
+class Tormenta(Componente):
+    """Aeropuerto cerrado en [t_inicio, t_inicio + duracion) de cada día: nadie aterriza."""
+
+    def __init__(self, t_inicio=600, duracion=30):
+        self.t_inicio = t_inicio
+        self.t_fin = t_inicio + duracion
+
+    def al_tocar_pista(self, sim, avion, minuto):
+        if self.t_inicio <= sim.minuto_del_dia(minuto) < self.t_fin:
+            return REGRESANDO_TORMENTA
+        return None
+
+
+class Reintentos(Componente):
+    """Al salir del radar, el avión vuelve a intentar hasta intentos_permitidos veces."""
+
+    def __init__(self, intentos_permitidos=1):
+        self.intentos_permitidos = intentos_permitidos
+
+    def al_salir_del_radar(self, sim, avion):
+        if avion.intentos < self.intentos_permitidos:
+            avion.intentos += 1
+            return ACERCANDOSE
+        return None
+
+
+# ======================
+# Motor de escenarios
+# ======================
+class SimuladorEscenario(Simulador):
+    """
+    Un solo motor para todos los escenarios: los componentes se combinan libremente,
+    p. ej. SimuladorEscenario(componentes=[Tormenta(600, 30), Viento()]).
+
+    - Los estados son EstadoAvion; todos los REGRESANDO_* se tratan como regreso
+      (control de hueco, se alejan de la pista), como en SimuladorTormenta.
+    - Los ganchos se consultan en el orden de componentes y gana el primero que
+      interviene (con Tormenta antes que Viento, con el aeropuerto cerrado no se
+      sortea viento).
+    - Control, movimiento y detección de aterrizajes van en una sola pasada por la
+      cola: se usan las distancias del comienzo del minuto y la velocidad del líder
+      recién controlada (con tiempo_exacto el movimiento la cambia al cruzar un
+      tramo), así el resultado es el mismo que con las tres pasadas separadas.
+
+    Sin componentes da lo mismo que Simulador; con [Tormenta(...)], lo mismo que
+    SimuladorTormenta, y con [Reintentos(...)], lo mismo que Simulador_con_reintentos.
+    Con Viento difiere de SimuladorViento, donde un REGRESANDO por congestión se
+    mueve hacia la pista y el de viento vuelve a la fila sin buscar hueco.
+    """
+
+    def __init__(self, seed=42, componentes=(), separacion=None, nivel_registro="completo",
+                 flujos_separados=False, antitetico=False, metricas_pedidas=None, tiempo_exacto=False):
+        super().__init__(seed, nivel_registro, flujos_separados, antitetico, metricas_pedidas, tiempo_exacto)
+        self.componentes = list(componentes)
+        self.separacion = separacion or PoliticaSeparacion()
+        self.cola = ColaAproximacion(finales=FINALES, en_fila=(APROXIMANDO, AJUSTANDO))
+
+    def agregar_avion(self, minuto: int, next_id: int) -> int:
+        avion = AvionEscenario(next_id, minuto)
+        self.aviones[next_id] = avion
+        self.cola.insertar(avion)
+        return next_id + 1
+
+    def avanzar_minuto(self, minuto: int):
+        cola = self.cola.ordenar()
+        distancias = self.cola.distancias()
+        en_pista = []
+        # corre por avión y minuto: lo que se consulta en cada vuelta va a variables locales
+        controlar, controlar_regreso = self.separacion.controlar, self.controlar_regreso
+        exacto, cruces, tramos = self.tiempo_exacto, self.cruces_tramo, self.separacion.tramos
+        dist_lider, vel_lider = 0.0, None   # vel_lider None: sin líder, o el líder regresa
+
+        for avion, dist in zip(cola, distancias):
+            if avion.estado in REGRESANDO_ALGUNO:
+                controlar_regreso(avion, dist)
+            else:
+                controlar(avion, dist, vel_lider, dist_lider)
+
+            estado, velocidad = avion.estado, avion.velocidad
+            if estado in REGRESANDO_ALGUNO:
+                avion.distancia = dist + velocidad / 60.0
+                vel_lider = None
+            else:
+                if estado not in FINALES:
+                    if exacto:
+                        if volar_exacto(avion, dist, minuto, aproximando=estado == APROXIMANDO,
+                                        cruces=cruces, tramos=tramos):
+                            en_pista.append(avion)
+                    else:
+                        avion.distancia = dist - velocidad / 60.0
+                        if avion.distancia <= 0:
+                            en_pista.append(avion)
+                vel_lider = velocidad
+            dist_lider = dist
+
+        # de a uno en orden de id, como recorría self.aviones (importa para el sorteo de viento)
+        en_pista.sort(key=lambda av: av.id)
+        for avion in en_pista:
+            self.tocar_pista(avion, minuto)
+        self.guardar_estado(minuto)
+
+    def controlar_regreso(self, avion, dist: float):
+        if dist > RADAR_DIST:
+            for componente in self.componentes:
+                nuevo = componente.al_salir_del_radar(self, avion)
+                if nuevo is not None:
+                    avion.estado = nuevo
+                    return
+            avion.estado = DESVIADO
+        elif self.cola.hay_gap(avion, self.separacion.tramos):
+            avion.estado = APROXIMANDO
+
+    def tocar_pista(self, avion, minuto: int, tiempo_ideal=23.4):
+        for componente in self.componentes:
+            nuevo = componente.al_tocar_pista(self, avion, minuto)
+            if nuevo is not None:
+                avion.estado = nuevo
+                avion.velocidad = VEL_GO_AROUND
+                avion.distancia = DIST_GO_AROUND
+                return
+        avion.estado = ATERRIZADO
+        avion.t_aterrizaje = self.momento_toque(avion, minuto)
+        tiempo_real = avion.t_aterrizaje - avion.tiempo_llegada
+        avion.retraso = max(0, tiempo_real - tiempo_ideal)
+        self.finalizados.append(avion)
@@ -1,10 +1,17 @@
+import copy
+import csv
+import math
+import subprocess
+from bisect import bisect_left, bisect_right
 import numpy as np
+from enum import IntEnum
 from typing import List
 import numpy as np
+import matplotlib as mpl
 import matplotlib.pyplot as plt
 import matplotlib.cm as cm
-from matplotlib.animation import FuncAnimation, FFMpegWriter
-import itertools
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
 from matplotlib.offsetbox import OffsetImage, AnnotationBbox
 import matplotlib.image as mpimg
 
@@ -17,6 +24,457 @@ MIN_SEPARACION = 4
 VEL_RETROCESO = 200.0
 
 
+# ======================
+# Códigos de estado
+# ======================
+class EstadoAvion(IntEnum):
+    """Estados de un avión como enteros chicos (los finales van al último)."""
+    APROXIMANDO = 0
+    AJUSTANDO = 1
+    REGRESANDO = 2
+    REGRESANDO_VIENTO = 3
+    REGRESANDO_TORMENTA = 4
+    ACERCANDOSE = 5
+    DESVIADO = 6
+    ATERRIZADO = 7
+
+
+# Acepta tanto el nombre (motores con estados como texto) como el miembro del enum
+CODIGO_ESTADO = {e.name: int(e) for e in EstadoAvion}
+CODIGO_ESTADO.update({e: int(e) for e in EstadoAvion})
+NOMBRE_ESTADO = [e.name for e in EstadoAvion]
+
+
+# códigos como int (leer EstadoAvion.X pasa por la metaclase de Enum, y esto corre cada minuto)
+_AJUSTANDO, _REGRESANDO, _DESVIADO = int(EstadoAvion.AJUSTANDO), int(EstadoAvion.REGRESANDO), int(EstadoAvion.DESVIADO)
+# avion.estado de los que vuelan libre, como nombre o como miembro (ver minutos_libres)
+_SOLO_APROXIMANDO = frozenset({"APROXIMANDO", EstadoAvion.APROXIMANDO})
+
+
+def codigos_estado(aviones: list) -> np.ndarray:
+    """Códigos de EstadoAvion (int8) de una lista de objetos Avion."""
+    return np.fromiter((CODIGO_ESTADO[a.estado] for a in aviones), dtype=np.int8, count=len(aviones))
+
+
+# ======================
+# Registro de trayectorias (historial columnar)
+# ======================
+NIVELES_REGISTRO = ("off", "resumen", "activos", "completo")
+
+
+class RegistroTrayectorias:
+    """
+    Historial de la simulación en columnas de NumPy que crecen duplicando capacidad.
+
+    Niveles:
+    - "off": no guarda nada.
+    - "resumen": solo la cantidad de aviones por estado en cada minuto (conteos).
+    - "activos": conteos + una fila por avión en el aire; el minuto en que aterriza
+      o se desvía se registra una última vez y después no se vuelve a guardar.
+    - "completo": conteos + una fila por avión generado en cada minuto, igual que
+      el historial original de diccionarios.
+
+    Los estados se guardan como códigos de EstadoAvion (int8). Para código viejo,
+    iterar el registro devuelve los mismos diccionarios que antes.
+
+    registrar acumula las filas en listas de Python (un minuto tiene pocos aviones y
+    NumPy no conviene para arreglos tan chicos) y las pasa a las columnas en bloques
+    de TAM_VOLCADO filas, o al leer.
+    """
+    TAM_VOLCADO = 1 << 16
+
+    def __init__(self, nivel: str = "completo", capacidad: int = 1024):
+        if nivel not in NIVELES_REGISTRO:
+            raise ValueError(f"nivel de registro inválido: {nivel!r} (opciones: {NIVELES_REGISTRO})")
+        self.nivel = nivel
+        self.n = 0
+        self._minuto = np.empty(capacidad, dtype=np.int32)
+        self._id = np.empty(capacidad, dtype=np.int32)
+        self._distancia = np.empty(capacidad)
+        self._velocidad = np.empty(capacidad)
+        self._estado = np.empty(capacidad, dtype=np.int8)
+        self.n_minutos = 0
+        self._minutos_conteo = np.empty(64, dtype=np.int32)
+        self._conteos = np.zeros((64, len(EstadoAvion)), dtype=np.int32)
+        self._cerrados: set[int] = set()
+        # columnas (minuto, id, distancia, velocidad, estado) y conteos todavía sin volcar
+        self._filas = ([], [], [], [], [])
+        self._filas_conteo: list = []
+
+    # --- escritura ---
+    def _reservar(self, extra: int):
+        necesario = self.n + extra
+        if necesario <= self._minuto.size:
+            return
+        nueva = max(necesario, 2 * self._minuto.size)
+        for nombre in ("_minuto", "_id", "_distancia", "_velocidad", "_estado"):
+            viejo = getattr(self, nombre)
+            arr = np.empty(nueva, dtype=viejo.dtype)
+            arr[:self.n] = viejo[:self.n]
+            setattr(self, nombre, arr)
+
+    def _reservar_conteos(self, extra: int):
+        necesario = self.n_minutos + extra
+        if necesario <= self._minutos_conteo.size:
+            return
+        nueva = max(necesario, 2 * self._minutos_conteo.size)
+        self._minutos_conteo = np.concatenate(
+            [self._minutos_conteo[:self.n_minutos], np.empty(nueva - self.n_minutos, dtype=np.int32)])
+        self._conteos = np.concatenate(
+            [self._conteos[:self.n_minutos], np.zeros((nueva - self.n_minutos, len(EstadoAvion)), dtype=np.int32)])
+
+    def _volcar(self):
+        """Pasa a las columnas de NumPy las filas y conteos acumulados en listas."""
+        if self._filas_conteo:
+            conteos = np.array(self._filas_conteo, dtype=np.int32)
+            k = len(conteos)
+            self._reservar_conteos(k)
+            self._minutos_conteo[self.n_minutos:self.n_minutos + k] = conteos[:, 0]
+            self._conteos[self.n_minutos:self.n_minutos + k] = conteos[:, 1:]
+            self.n_minutos += k
+            self._filas_conteo = []
+        k = len(self._filas[0])
+        if k:
+            self._reservar(k)
+            fin = self.n + k
+            for columna, valores in zip((self._minuto, self._id, self._distancia, self._velocidad, self._estado),
+                                        self._filas):
+                columna[self.n:fin] = valores
+            self.n = fin
+            self._filas = ([], [], [], [], [])
+
+    def registrar(self, minuto: int, aviones, estados=None, conteo_extra=None):
+        """
+        Registra un minuto a partir de objetos Avion (estados: sus códigos, si ya se
+        calcularon). conteo_extra: aviones por estado que no vienen en la lista (los ya
+        archivados), para que los conteos sigan cubriendo a todos los generados.
+        """
+        if self.nivel == "off":
+            return
+        if not isinstance(aviones, list):
+            aviones = list(aviones)
+        if estados is None:
+            estados = [CODIGO_ESTADO[a.estado] for a in aviones]
+        elif isinstance(estados, np.ndarray):
+            estados = estados.tolist()
+        conteo = [minuto] + (list(conteo_extra) if conteo_extra is not None else [0] * len(EstadoAvion))
+        for e in estados:
+            conteo[e + 1] += 1
+        self._filas_conteo.append(conteo)
+        if aviones and self.nivel != "resumen":
+            if self.nivel == "activos":
+                quedan = []
+                for a, e in zip(aviones, estados):
+                    if e >= EstadoAvion.DESVIADO:
+                        if a.id in self._cerrados:
+                            continue
+                        self._cerrados.add(a.id)
+                    quedan.append((a, e))
+                aviones = [a for a, _ in quedan]
+                estados = [e for _, e in quedan]
+            minutos, ids, distancias, velocidades, codigos = self._filas
+            minutos.extend([minuto] * len(aviones))
+            ids.extend([a.id for a in aviones])
+            distancias.extend([a.distancia for a in aviones])
+            velocidades.extend([a.velocidad for a in aviones])
+            codigos.extend(estados)
+        if len(self._filas[0]) >= self.TAM_VOLCADO or len(self._filas_conteo) >= self.TAM_VOLCADO:
+            self._volcar()
+
+    def _contar(self, minuto: int, estados: np.ndarray, conteo_extra=None):
+        self._reservar_conteos(1)
+        self._minutos_conteo[self.n_minutos] = minuto
+        self._conteos[self.n_minutos] = np.bincount(estados, minlength=len(EstadoAvion))
+        if conteo_extra is not None:
+            self._conteos[self.n_minutos] += conteo_extra
+        self.n_minutos += 1
+
+    def registrar_arreglos(self, minuto: int, ids, distancia, velocidad, estados, conteo_extra=None):
+        """Registra un minuto a partir de columnas (ids, distancia, velocidad, códigos de estado)."""
+        if self.nivel == "off":
+            return
+        self._volcar()
+        self._contar(minuto, estados, conteo_extra)
+        if self.nivel == "resumen":
+            return
+        if self.nivel == "activos":
+            finales = np.flatnonzero(estados >= EstadoAvion.DESVIADO)
+            nuevos = [i for i in finales.tolist() if int(ids[i]) not in self._cerrados]
+            self._cerrados.update(int(ids[i]) for i in nuevos)
+            mascara = estados < EstadoAvion.DESVIADO
+            mascara[nuevos] = True
+            ids, distancia, velocidad, estados = ids[mascara], distancia[mascara], velocidad[mascara], estados[mascara]
+
+        k = len(ids)
+        self._reservar(k)
+        fin = self.n + k
+        self._minuto[self.n:fin] = minuto
+        self._id[self.n:fin] = ids
+        self._distancia[self.n:fin] = distancia
+        self._velocidad[self.n:fin] = velocidad
+        self._estado[self.n:fin] = estados
+        self.n = fin
+
+    # --- lectura ---
+    @property
+    def minuto(self) -> np.ndarray:
+        self._volcar()
+        return self._minuto[:self.n]
+
+    @property
+    def id(self) -> np.ndarray:
+        self._volcar()
+        return self._id[:self.n]
+
+    @property
+    def distancia(self) -> np.ndarray:
+        self._volcar()
+        return self._distancia[:self.n]
+
+    @property
+    def velocidad(self) -> np.ndarray:
+        self._volcar()
+        return self._velocidad[:self.n]
+
+    @property
+    def estado(self) -> np.ndarray:
+        self._volcar()
+        return self._estado[:self.n]
+
+    @property
+    def conteos(self) -> np.ndarray:
+        """Matriz (minutos registrados × estados) con la cantidad de aviones en cada estado."""
+        self._volcar()
+        return self._conteos[:self.n_minutos]
+
+    @property
+    def minutos_conteo(self) -> np.ndarray:
+        self._volcar()
+        return self._minutos_conteo[:self.n_minutos]
+
+    def columnas(self) -> dict:
+        return {"minuto": self.minuto, "id": self.id, "distancia": self.distancia,
+                "velocidad": self.velocidad, "estado": self.estado}
+
+    def trayectorias(self) -> dict:
+        """{id: (minutos, distancias, estados)} agrupando las columnas por avión."""
+        orden = np.lexsort((self.minuto, self.id))
+        ids = self.id[orden]
+        cortes = np.flatnonzero(np.diff(ids)) + 1
+        grupos = np.split(orden, cortes) if orden.size else []
+        return {int(self.id[g[0]]): (self.minuto[g], self.distancia[g], self.estado[g]) for g in grupos}
+
+    def congestion(self) -> float:
+        """
+        Fracción de registros (avión, minuto) en AJUSTANDO o REGRESANDO, contando todos
+        los aviones generados en cada minuto (la métrica de ej4). nan si el nivel es "off".
+        """
+        c = self.conteos
+        if self.n_minutos == 0:
+            return float("nan")
+        total = c.sum()
+        cong = c[:, EstadoAvion.AJUSTANDO].sum() + c[:, EstadoAvion.REGRESANDO].sum()
+        return float(cong / max(1, total))
+
+    def __len__(self):
+        return self.n + len(self._filas[0])
+
+    def __iter__(self):
+        for m, i, d, v, e in zip(self.minuto.tolist(), self.id.tolist(), self.distancia.tolist(),
+                                 self.velocidad.tolist(), self.estado.tolist()):
+            yield {"minuto": m, "id": i, "distancia": d, "velocidad": v, "estado": NOMBRE_ESTADO[e]}
+
+    # --- exportación ---
+    def guardar_npz(self, ruta: str):
+        np.savez_compressed(ruta, nivel=self.nivel, conteos=self.conteos,
+                            minutos_conteo=self.minutos_conteo, **self.columnas())
+
+    @classmethod
+    def cargar_npz(cls, ruta: str) -> "RegistroTrayectorias":
+        datos = np.load(ruta)
+        registro = cls(str(datos["nivel"]), capacidad=max(1, datos["minuto"].size))
+        k = datos["minuto"].size
+        for nombre in ("minuto", "id", "distancia", "velocidad", "estado"):
+            getattr(registro, f"_{nombre}")[:k] = datos[nombre]
+        registro.n = k
+        registro._conteos = datos["conteos"].copy()
+        registro._minutos_conteo = datos["minutos_conteo"].copy()
+        registro.n_minutos = registro._conteos.shape[0]
+        return registro
+
+    def guardar_parquet(self, ruta: str):
+        """Exporta las filas a Parquet (requiere pyarrow)."""
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise ImportError("guardar_parquet requiere pyarrow (pip install pyarrow)") from e
+        tabla = pa.table(self.columnas())
+        pq.write_table(tabla, ruta)
+
+
+# ======================
+# Cola de aproximación
+# ======================
+class ColaAproximacion:
+    """
+    Aviones en el aire ordenados por (distancia, id), mantenida entre minutos.
+
+    - Los nuevos se insertan en el borde del radar, recorriendo desde el final.
+    - ordenar() repara el orden con inserción: después de un minuto de movimiento
+      la cola está casi ordenada y el costo es lineal en los aviones en el aire.
+    - Los ATERRIZADO/DESVIADO pasan a self.archivo y dejan de recorrerse.
+
+    El orden es el mismo que ordenar por distancia (estable) los aviones en orden de id.
+    Las distancias de la cola ordenada sirven de índice para hay_gap (bisect).
+    finales y en_fila indican cómo se escriben los estados (texto o EstadoAvion).
+    """
+
+    def __init__(self, finales=("ATERRIZADO", "DESVIADO"), en_fila=("APROXIMANDO", "AJUSTANDO")):
+        self.finales = finales
+        self.en_fila = en_fila
+        self.activos: list = []
+        self.archivo: list = []
+        self.conteo_archivo = [0] * len(EstadoAvion)
+        self._distancias = None
+
+    @staticmethod
+    def _va_despues(a, b) -> bool:
+        return a.distancia > b.distancia or (a.distancia == b.distancia and a.id > b.id)
+
+    def insertar(self, avion):
+        i = len(self.activos)
+        while i > 0 and self._va_despues(self.activos[i - 1], avion):
+            i -= 1
+        self.activos.insert(i, avion)
+
+    def ordenar(self) -> list:
+        cola = self.activos
+        for i in range(1, len(cola)):
+            avion = cola[i]
+            j = i - 1
+            if not self._va_despues(cola[j], avion):
+                continue
+            while j >= 0 and self._va_despues(cola[j], avion):
+                cola[j + 1] = cola[j]
+                j -= 1
+            cola[j + 1] = avion
+        self._distancias = None
+        return cola
+
+    def distancias(self) -> list:
+        """Distancias de la cola ordenada; se arman una vez por minuto, al primer uso."""
+        if self._distancias is None:
+            self._distancias = [a.distancia for a in self.activos]
+        return self._distancias
+
+    def hay_gap(self, avion, tramos=None) -> bool:
+        """
+        Igual que hay_gap_disponible(avion, self.activos), en tiempo logarítmico: como
+        las distancias no cambian durante actualizar_estados, bisect ubica la ventana
+        ±aterrizaje_libre(pos, 5) y solo se miran los estados de los que caen adentro
+        (con su valor del momento, igual que el recorrido completo).
+        tramos: TramosVelocidad cuya máxima da el avance (None = los de siempre).
+        """
+        pos = avion.distancia
+        vel_maxima = vel_maxima_permitida_por_tramo if tramos is None else tramos.maxima
+        avance = aterrizaje_libre(pos, minutos=5, vel_maxima=vel_maxima)
+        distancias = self.distancias()
+        cola = self.activos
+        en_fila = self.en_fila
+        for k in range(bisect_left(distancias, pos - avance), bisect_right(distancias, pos + avance)):
+            if cola[k].estado in en_fila:
+                return False
+        return True
+
+    def en_pista(self) -> list:
+        """Aviones en el aire que llegaron a la pista, en orden de id (como recorría self.aviones)."""
+        llegan = [a for a in self.activos if a.distancia <= 0 and a.estado not in self.finales]
+        llegan.sort(key=lambda av: av.id)
+        return llegan
+
+    def archivar_finalizados(self) -> list:
+        """Pasa los aviones terminados al archivo y los devuelve."""
+        terminados = [a for a in self.activos if a.estado in self.finales]
+        if terminados:
+            self.activos = [a for a in self.activos if a.estado not in self.finales]
+            self.archivo.extend(terminados)
+            for avion in terminados:
+                self.conteo_archivo[CODIGO_ESTADO[avion.estado]] += 1
+        return terminados
+
+
+# ======================
+# Métricas en línea de un día
+# ======================
+class MetricasDia:
+    """
+    KPIs de un día acumulados minuto a minuto, sin necesidad de guardar historial:
+    - atraso: atraso promedio de los aterrizados
+    - desvio: fracción de aviones desviados
+    - congestion: fracción de registros (avión, minuto) en AJUSTANDO o REGRESANDO,
+      contando todos los aviones generados (la métrica de ej4)
+    """
+
+    def __init__(self):
+        self.registros = 0
+        self.registros_congestion = 0
+        self.n_aviones = 0
+        self.desviados = 0
+        self.aterrizados = 0
+        self.suma_atraso = 0.0
+
+    def registrar_minuto(self, estados, n_aviones: int, desviados: int):
+        """
+        Suma un minuto. estados: códigos de (al menos) todos los aviones en el aire
+        (lista, o arreglo en el motor vectorizado), o None si no se pidió la
+        congestión; n_aviones y desviados: totales del día hasta este minuto.
+        """
+        self.registros += n_aviones
+        if isinstance(estados, np.ndarray):
+            self.registros_congestion += int(np.count_nonzero(
+                (estados == _AJUSTANDO) | (estados == _REGRESANDO)))
+        elif estados is not None:
+            self.registros_congestion += estados.count(_AJUSTANDO) + estados.count(_REGRESANDO)
+        self.n_aviones = n_aviones
+        self.desviados = desviados
+
+    def registrar_minutos_libres(self, minutos: int):
+        """Suma minutos salteados sin cambios de estado (modo por eventos): nadie congestionado."""
+        self.registros += self.n_aviones * minutos
+
+    def registrar_aterrizajes(self, retrasos):
+        for r in retrasos:
+            self.aterrizados += 1
+            self.suma_atraso += r
+
+    def valores(self) -> dict:
+        return {
+            "atraso": self.suma_atraso / self.aterrizados if self.aterrizados else 0.0,
+            "desvio": self.desviados / max(1, self.n_aviones),
+            "congestion": self.registros_congestion / max(1, self.registros),
+            "n_aviones": self.n_aviones,
+            "aterrizados": self.aterrizados,
+            "desviados": self.desviados,
+        }
+
+
+# Métricas que puede pedir un simulador y las que salen solo de las llegadas
+METRICAS_DISPONIBLES = ("atraso", "desvio", "congestion", "n_aviones", "aterrizados", "desviados")
+METRICAS_SOLO_LLEGADAS = frozenset({"n_aviones"})
+
+
+def validar_metricas(metricas_pedidas) -> frozenset:
+    """Conjunto de métricas pedidas (None = todas); ValueError si alguna no existe."""
+    if metricas_pedidas is None:
+        return frozenset(METRICAS_DISPONIBLES)
+    pedidas = frozenset(metricas_pedidas)
+    desconocidas = pedidas - set(METRICAS_DISPONIBLES)
+    if desconocidas:
+        raise ValueError(f"métricas desconocidas: {sorted(desconocidas)} (opciones: {METRICAS_DISPONIBLES})")
+    return pedidas
+
+
 # ======================
 # Funciones auxiliares
 # ======================
@@ -52,9 +510,9 @@ def tiempo_entre_aviones(avion_trasero, avion_delantero):
     return (delta_dist / avion_trasero.velocidad) * 60
 
 
-def aterrizaje_libre(dist_inicial, minutos) -> float:
+def aterrizaje_libre(dist_inicial, minutos, vel_maxima=vel_maxima_permitida_por_tramo) -> float:
     """Distancia que se cubriría a velocidad máxima en un lapso dado."""
-    v_max = vel_maxima_permitida_por_tramo(dist_inicial)
+    v_max = vel_maxima(dist_inicial)
     return (v_max / 60.0) * minutos
 
 
@@ -70,6 +528,93 @@ def hay_gap_disponible(avion, cola) -> bool:
     return True
 
 
+# Límites de los tramos de velocidad (nm), de afuera hacia la pista
+LIMITES_TRAMO = (50, 15, 5, 0)
+
+
+class TramosVelocidad:
+    """
+    Tramos de velocidad configurables: con dist > limites[i] (el primero que se
+    cumple) rigen vel_max[i] y vel_min[i]. El último límite es la pista (0). Sin
+    argumentos son los tramos de vel_maxima_permitida_por_tramo y
+    velocidad_minima_permitida_por_tramo.
+    """
+
+    def __init__(self, limites=LIMITES_TRAMO, vel_max=(300, 250, 200, 150), vel_min=(250, 200, 150, 120)):
+        limites, vel_max, vel_min = tuple(limites), tuple(vel_max), tuple(vel_min)
+        if not (len(limites) == len(vel_max) == len(vel_min)):
+            raise ValueError("limites, vel_max y vel_min deben tener el mismo largo")
+        if list(limites) != sorted(limites, reverse=True) or limites[-1] != 0:
+            raise ValueError("los límites van de afuera hacia la pista y el último es 0")
+        if any(lo > hi for lo, hi in zip(vel_min, vel_max)) or min(vel_min) <= 0:
+            raise ValueError("cada tramo necesita 0 < vel_min <= vel_max")
+        self.limites = limites
+        self.vel_max = vel_max
+        self.vel_min = vel_min
+
+    def maxima(self, dist: float):
+        for limite, vel in zip(self.limites, self.vel_max):
+            if dist > limite:
+                return vel
+        return self.vel_max[-1]
+
+    def minima(self, dist: float):
+        for limite, vel in zip(self.limites, self.vel_min):
+            if dist > limite:
+                return vel
+        return self.vel_min[-1]
+
+    @property
+    def cierre_maximo(self) -> float:
+        """Lo más que se achica por minuto el hueco entre dos aviones en vuelo libre (nm)."""
+        return (max(self.vel_max) - min(self.vel_max)) / 60.0
+
+
+def volar_exacto(avion, dist: float, t0: float, dt=1.0, aproximando=True, cruces=None,
+                 tramos=None) -> bool:
+    """
+    Acerca avion a la pista durante dt minutos desde dist (nm), a partir del instante
+    t0, cambiando de velocidad justo al cruzar un límite de tramo y no al comienzo
+    del minuto siguiente. Al cruzar, el que aproxima pasa a la máxima del tramo nuevo
+    y los demás bajan a esa máxima si venían más rápido; cada cruce se agrega a
+    cruces como (id, instante, límite). tramos: TramosVelocidad (None = los de siempre).
+
+    Si toca la pista se detiene en 0, guarda el instante en avion.t_toque y devuelve True.
+    """
+    limites = LIMITES_TRAMO if tramos is None else tramos.limites
+    vel_maxima = vel_maxima_permitida_por_tramo if tramos is None else tramos.maxima
+    vel = avion.velocidad
+    t, fin = t0, t0 + dt
+    while vel > 0:
+        limite = next(b for b in limites if b < dist) if dist > 0 else 0
+        llegada = t + (dist - limite) * 60.0 / vel
+        if llegada > fin:
+            dist -= vel * (fin - t) / 60.0
+            break
+        t, dist = llegada, float(limite)
+        if limite == 0:
+            avion.distancia, avion.velocidad, avion.t_toque = 0.0, vel, t
+            return True
+        if cruces is not None:
+            cruces.append((avion.id, t, limite))
+        vel_tramo = vel_maxima(limite)
+        vel = vel_tramo if aproximando else min(vel, vel_tramo)
+    avion.distancia, avion.velocidad = dist, vel
+    return False
+
+
+def mover_exacto(sim, minuto: int, alejandose: tuple):
+    """mover_aviones con tiempo_exacto: los estados de alejandose se alejan como siempre."""
+    for avion in sim.cola.activos:
+        if avion.estado in ("ATERRIZADO", "DESVIADO"):
+            continue
+        if avion.estado in alejandose:
+            avion.distancia += avion.velocidad / 60.0
+        else:
+            volar_exacto(avion, avion.distancia, minuto, aproximando=avion.estado == "APROXIMANDO",
+                         cruces=sim.cruces_tramo)
+
+
 # ======================
 # Clase Avión
 # ======================
@@ -110,26 +655,204 @@ class Avion:
             self.velocidad = vel_maxima_permitida_por_tramo(self.distancia)
 
 
+# ======================
+# Números aleatorios por fuente
+# ======================
+FUENTES_ALEATORIAS = ("llegadas", "viento")
+# Rama del spawn_key reservada para las fuentes: no choca con SeedSequence.spawn()
+_RAMA_FUENTES = 2**32 - 1
+
+
+class GeneradorAntitetico:
+    """Envuelve un Generator y devuelve 1 - u por cada u: la réplica antitética."""
+
+    def __init__(self, base: np.random.Generator):
+        self.base = base
+
+    def random(self, size=None):
+        return 1.0 - self.base.random(size)
+
+    def geometric(self, p: float, size=None):
+        # por inversión, para que también use 1 - u
+        u = np.minimum(self.random(size), np.nextafter(1.0, 0.0))
+        return np.maximum(1, np.ceil(np.log1p(-u) / np.log1p(-p))).astype(np.int64)
+
+    def poisson(self, lam: float, size=None):
+        # por inversión de la acumulada (hasta lam + 10 desvíos), para que también use 1 - u
+        u = self.random(size)
+        if lam <= 0:
+            return np.zeros_like(u, dtype=np.int64)
+        k = np.arange(int(lam + 10 * np.sqrt(lam) + 10) + 1)
+        log_factorial = np.concatenate([[0.0], np.cumsum(np.log(k[1:]))])
+        acumulada = np.cumsum(np.exp(k * np.log(lam) - lam - log_factorial))
+        return np.minimum(np.searchsorted(acumulada, u, side="right"), k[-1])
+
+
+def crear_generadores(seed, flujos_separados=False, antitetico=False) -> dict:
+    """
+    Generadores de una simulación: {"rng": ..., "llegadas": ..., "viento": ...}.
+
+    - Por defecto todas las fuentes comparten un único default_rng(seed), como
+      siempre: los sorteos de llegadas y viento se intercalan.
+    - flujos_separados=True: cada fuente tiene su propio subflujo derivado de la
+      semilla, así dos escenarios con la misma semilla ven exactamente las mismas
+      llegadas aunque uno sortee viento y el otro no (números aleatorios comunes).
+    - antitetico=True: cada fuente devuelve 1 - u en lugar de u.
+    """
+    envolver = GeneradorAntitetico if antitetico else (lambda g: g)
+    if not flujos_separados:
+        rng = envolver(np.random.default_rng(seed))
+        return {"rng": rng, **{fuente: rng for fuente in FUENTES_ALEATORIAS}}
+    raiz = seed if isinstance(seed, np.random.SeedSequence) else np.random.SeedSequence(seed)
+    generadores = {}
+    for k, fuente in enumerate(("rng",) + FUENTES_ALEATORIAS):
+        hijo = np.random.SeedSequence(raiz.entropy, spawn_key=raiz.spawn_key + (_RAMA_FUENTES, k),
+                                      pool_size=raiz.pool_size)
+        generadores[fuente] = envolver(np.random.default_rng(hijo))
+    return generadores
+
+
+# ======================
+# Cronogramas de llegadas
+# ======================
+def perfil_lambda(lam, minutos: int) -> np.ndarray:
+    """λ por minuto a partir de un valor constante, un arreglo o una función λ(t)."""
+    if callable(lam):
+        perfil = np.asarray(lam(np.arange(minutos)), dtype=float)
+    else:
+        perfil = np.asarray(lam, dtype=float)
+    perfil = np.broadcast_to(perfil, (minutos,)) if perfil.ndim == 0 else perfil
+    if perfil.shape != (minutos,):
+        raise ValueError(f"el perfil λ(t) tiene {perfil.size} valores y el día {minutos} minutos")
+    return perfil
+
+
+def cronograma_llegadas(lam, minutos=18*60, rng=None, metodo="bernoulli") -> np.ndarray:
+    """
+    Minutos de llegada de todo el día, sorteados de una vez (ordenados).
+
+    - lam: λ constante, arreglo con un λ por minuto o función λ(t).
+    - metodo="bernoulli": a lo sumo un avión por minuto con probabilidad λ(t), el
+      mismo proceso que generar_nuevo_avion. Con el rng de llegadas de un simulador
+      da exactamente los mismos arribos que sortear minuto a minuto.
+    - metodo="exponencial": proceso de Poisson de tasa λ(t) por minuto (tiempos entre
+      llegadas exponenciales; λ(t) variable por thinning); puede haber más de un
+      arribo en el mismo minuto.
+    """
+    rng = np.random.default_rng() if rng is None else rng
+    perfil = perfil_lambda(lam, minutos)
+    if metodo == "bernoulli":
+        return np.flatnonzero(rng.random(minutos) < perfil)
+    if metodo == "exponencial":
+        tasa_max = float(perfil.max(initial=0.0))
+        if tasa_max <= 0:
+            return np.empty(0, dtype=np.int64)
+        # cantidad de arribos de un Poisson homogéneo de tasa_max, ubicados uniformes
+        n = rng.poisson(tasa_max * minutos)
+        tiempos = np.sort(rng.random(n) * minutos)
+        minuto = tiempos.astype(np.int64)
+        aceptados = rng.random(n) * tasa_max < perfil[minuto]
+        return minuto[aceptados]
+    raise ValueError(f"método de llegadas inválido: {metodo!r} (opciones: 'bernoulli', 'exponencial')")
+
+
+def leer_cronograma_csv(ruta: str, columna="minuto", hora_inicio="06:00") -> np.ndarray:
+    """
+    Minutos de llegada desde un CSV (p. ej. un cronograma real de AEP).
+
+    La columna puede tener minutos desde el inicio del día simulado o horas "HH:MM"
+    (o "HH:MM:SS"), que se pasan a minutos contando desde hora_inicio.
+    """
+    def a_minutos(hora: str) -> float:
+        partes = [float(x) for x in hora.split(":")]
+        partes += [0.0] * (3 - len(partes))
+        return partes[0] * 60 + partes[1] + partes[2] / 60
+
+    origen = a_minutos(hora_inicio)
+    minutos = []
+    with open(ruta, newline="", encoding="utf-8") as f:
+        for fila in csv.DictReader(f):
+            valor = fila[columna].strip()
+            if not valor:
+                continue
+            minutos.append(a_minutos(valor) - origen if ":" in valor else float(valor))
+    return np.sort(np.floor(minutos).astype(np.int64))
+
+
+def _llegadas_por_minuto(llegadas, minutos: int) -> list:
+    """Cantidad de arribos en cada minuto del día (los que caen fuera se ignoran)."""
+    llegadas = np.asarray(llegadas, dtype=np.int64)
+    dentro = llegadas[(llegadas >= 0) & (llegadas < minutos)]
+    return np.bincount(dentro, minlength=minutos).tolist()
+
+
+def _quitar_envolturas(sim):
+    """
+    Saca de sim (y de su cola) los métodos reemplazados en la instancia, como los
+    que envuelve un Perfilador: deepcopy no copia esas funciones y en una copia
+    seguirían llamando a los métodos del original. Quedan los de la clase.
+    """
+    for obj in (sim, getattr(sim, "cola", None)):
+        if obj is None:
+            continue
+        propios = vars(obj)
+        for nombre in [n for n, v in propios.items() if callable(v) and callable(getattr(type(obj), n, None))]:
+            del propios[nombre]
+
+
 # ======================
 # Clase Simulador
 # ======================
 class Simulador:
-    def __init__(self, seed=42):
-        self.rng = np.random.default_rng(seed)
+    """
+    metricas_pedidas: subconjunto de METRICAS_DISPONIBLES que hace falta calcular
+    (None = todas). Lo que ninguna métrica pedida usa no se corre: sin "congestion"
+    (y con nivel_registro="off") no se calculan los estados de cada minuto, y si
+    solo se pide "n_aviones" el día se reduce a sortear las llegadas.
+
+    tiempo_exacto: los aviones cambian de velocidad en el instante en que cruzan un
+    límite de tramo y aterrizan en el instante en que llegan a la pista (ver
+    volar_exacto), en vez de pasarse hasta el final del minuto. t_aterrizaje y
+    retraso quedan con fracción de minuto y los cruces se guardan en cruces_tramo
+    como (id, instante, límite). Un tick de un minuto da entonces la misma
+    cinemática que pasos más finos; sin tiempo_exacto todo queda como siempre.
+    """
+    # estados que se alejan de la pista en mover_aviones
+    ALEJANDOSE = ("REGRESANDO",)
+    # largo del día con tiempo continuo (simular_periodo); None: un solo día
+    minutos_dia = None
+
+    def __init__(self, seed=42, nivel_registro="completo", flujos_separados=False, antitetico=False,
+                 metricas_pedidas=None, tiempo_exacto=False):
+        self.metricas_pedidas = validar_metricas(metricas_pedidas)
+        self.tiempo_exacto = tiempo_exacto
+        self.cruces_tramo: list = []
+        generadores = crear_generadores(seed, flujos_separados, antitetico)
+        self.rng = generadores["rng"]
+        self.rng_llegadas = generadores["llegadas"]
+        self.rng_viento = generadores["viento"]
         self.aviones: dict[int, Avion] = {}
-        self.historial = []
+        self.historial = RegistroTrayectorias(nivel_registro)
+        self.metricas = MetricasDia()
+        self.cola = ColaAproximacion()
         self.finalizados: List[Avion] = []
+        # aviones terminados que se sacaron de memoria (modo de largo plazo, ver periodo.py)
+        self.purgados = 0
+        self.aterrizados_purgados = 0
 
     def generar_nuevo_avion(self, minuto: int, next_id: int, lam: float) -> int:
-        if self.rng.random() < lam:
-            avion = Avion(next_id, minuto)
-            self.aviones[next_id] = avion
-            return next_id + 1
+        if self.rng_llegadas.random() < lam:
+            return self.agregar_avion(minuto, next_id)
         return next_id
 
+    def agregar_avion(self, minuto: int, next_id: int) -> int:
+        avion = Avion(next_id, minuto)
+        self.aviones[next_id] = avion
+        self.cola.insertar(avion)
+        return next_id + 1
+
     def actualizar_estados(self, minuto: int):
-        activos = [a for a in self.aviones.values() if a.estado not in ("ATERRIZADO", "DESVIADO")]
-        activos.sort(key=lambda av: av.distancia)
+        activos = self.cola.ordenar()
 
         for i, avion in enumerate(activos):
             if avion.estado == "REGRESANDO":
@@ -141,11 +864,11 @@ class Simulador:
     def controlar_regreso(self, avion, cola):
         if avion.distancia > RADAR_DIST:
             avion.estado = "DESVIADO"
-        elif hay_gap_disponible(avion, cola):
+        elif self.cola.hay_gap(avion):
             avion.estado = "APROXIMANDO"
 
     def mover_aviones(self):
-        for avion in self.aviones.values():
+        for avion in self.cola.activos:
             if avion.estado in ("ATERRIZADO", "DESVIADO"):
                 continue
             delta = avion.velocidad / 60.0
@@ -155,34 +878,176 @@ class Simulador:
                 avion.distancia -= delta
 
     def gestionar_finalizados(self, minuto: int, tiempo_ideal=23.4):
-        for avion in self.aviones.values():
+        for avion in self.cola.en_pista():
             if avion.estado in ("ATERRIZADO", "DESVIADO"):
                 continue
             if avion.distancia <= 0:
                 avion.estado = "ATERRIZADO"
-                avion.t_aterrizaje = minuto
-                tiempo_real = minuto - avion.tiempo_llegada
+                avion.t_aterrizaje = self.momento_toque(avion, minuto)
+                tiempo_real = avion.t_aterrizaje - avion.tiempo_llegada
                 avion.retraso = max(0, tiempo_real - tiempo_ideal)
                 self.finalizados.append(avion)
 
     def guardar_estado(self, minuto: int):
-        for avion in self.aviones.values():
-            self.historial.append({
-                "minuto": minuto,
-                "id": avion.id,
-                "distancia": avion.distancia,
-                "velocidad": avion.velocidad,
-                "estado": avion.estado,
-            })
-
-    def simular_dia(self, lam: float, minutos=18*60):
-        next_id = 1
-        for minuto in range(minutos):
-            next_id = self.generar_nuevo_avion(minuto, next_id, lam)
-            self.actualizar_estados(minuto)
+        archivo_previo = self.cola.conteo_archivo[:]
+        recien = self.cola.archivar_finalizados()
+        if self.historial.nivel == "completo":
+            aviones, archivo_previo = list(self.aviones.values()), None
+        else:
+            # los archivados de minutos anteriores entran solo como conteos
+            aviones = self.cola.activos + recien
+        estados = None
+        if "congestion" in self.metricas_pedidas or self.historial.nivel != "off":
+            # listas de int: para los pocos aviones de un minuto NumPy cuesta más de lo que ahorra
+            estados = [CODIGO_ESTADO[a.estado] for a in aviones]
+        self.metricas.registrar_minuto(estados, len(self.aviones) + self.purgados,
+                                       self.cola.conteo_archivo[_DESVIADO])
+        pendientes = self.metricas.aterrizados - self.aterrizados_purgados
+        if pendientes < len(self.finalizados):
+            self.metricas.registrar_aterrizajes(a.retraso for a in self.finalizados[pendientes:])
+        self.historial.registrar(minuto, aviones, estados, conteo_extra=archivo_previo)
+
+    def mover_aviones_exacto(self, minuto: int):
+        mover_exacto(self, minuto, self.ALEJANDOSE)
+
+    def minuto_del_dia(self, minuto: int) -> int:
+        """
+        Minuto dentro del día de operación, para las perturbaciones con horario. Es
+        minuto, salvo que simular_periodo haya fijado minutos_dia (tiempo continuo).
+        """
+        return minuto if self.minutos_dia is None else minuto % self.minutos_dia
+
+    def momento_toque(self, avion, minuto: int):
+        """Minuto del tick en que aterriza o, con tiempo_exacto, el instante del toque."""
+        return avion.t_toque if self.tiempo_exacto else minuto
+
+    def avanzar_minuto(self, minuto: int):
+        self.actualizar_estados(minuto)
+        if self.tiempo_exacto:
+            self.mover_aviones_exacto(minuto)
+        else:
             self.mover_aviones()
-            self.gestionar_finalizados(minuto)
-            self.guardar_estado(minuto)
+        self.gestionar_finalizados(minuto)
+        self.guardar_estado(minuto)
+
+    def simular_dia(self, lam=0.0, minutos=18*60, llegadas=None):
+        """
+        lam: λ constante o perfil λ(t) (arreglo por minuto o función).
+        llegadas: minutos de llegada ya sorteados o leídos de un CSV (ver
+        cronograma_llegadas y leer_cronograma_csv); si se pasan, lam no se usa.
+
+        Si las llegadas tienen su propio flujo (flujos_separados=True) o λ varía en
+        el tiempo, se sortean de una vez al principio; con el flujo compartido y λ
+        constante se sortea minuto a minuto como siempre, para no cambiar el orden
+        de los sorteos de viento.
+        """
+        if self.metricas_pedidas <= METRICAS_SOLO_LLEGADAS:
+            self.simular_llegadas(lam, minutos, llegadas)
+            return
+        self.iniciar_dia(lam, minutos, llegadas)
+        self.continuar(minutos)
+
+    def iniciar_dia(self, lam=0.0, minutos=18*60, llegadas=None):
+        """Prepara un día (mismos argumentos que simular_dia) sin correr ningún minuto."""
+        self.lam, self.minuto, self.next_id = lam, 0, 1
+        self.llegadas_por_minuto = None
+        if llegadas is None and (np.ndim(lam) != 0 or callable(lam) or self.rng_llegadas is not self.rng):
+            llegadas = cronograma_llegadas(lam, minutos, self.rng_llegadas)
+        if llegadas is not None:
+            self.llegadas_por_minuto = _llegadas_por_minuto(llegadas, minutos)
+
+    def continuar(self, hasta: int):
+        """Corre los minutos self.minuto .. hasta - 1 del día preparado con iniciar_dia."""
+        next_id = self.next_id
+        if self.llegadas_por_minuto is None:
+            for minuto in range(self.minuto, hasta):
+                next_id = self.generar_nuevo_avion(minuto, next_id, self.lam)
+                self.avanzar_minuto(minuto)
+        else:
+            for minuto in range(self.minuto, hasta):
+                for _ in range(self.llegadas_por_minuto[minuto]):
+                    next_id = self.agregar_avion(minuto, next_id)
+                self.avanzar_minuto(minuto)
+        self.next_id = next_id
+        self.minuto = max(self.minuto, hasta)
+
+    # --- snapshots ---
+    def snapshot(self) -> dict:
+        """
+        Copia independiente de todo el estado: aviones, cola, métricas, historial,
+        generadores aleatorios y minuto actual. Se puede restaurar varias veces.
+        Los métodos que un Perfilador envolvió no se copian (ver _quitar_envolturas).
+        """
+        copia = copy.copy(self)
+        copia.__dict__ = copy.deepcopy(self.__dict__)
+        _quitar_envolturas(copia)
+        return copia.__dict__
+
+    def restaurar(self, estado: dict):
+        self.__dict__.update(copy.deepcopy(estado))
+
+    def fork(self, **cambios):
+        """
+        Simulador nuevo con una copia del estado actual y los atributos de cambios
+        reemplazados, p. ej. sim.fork(t_inicio=600, t_fin=660) a partir del minuto
+        600 de un día sin tormenta. Con continuar(minutos) se completa el día.
+        Si el original tiene un Perfilador, la rama sale sin él: para perfilarla hay
+        que ponerle uno propio.
+        """
+        rama = copy.deepcopy(self)
+        _quitar_envolturas(rama)
+        for nombre, valor in cambios.items():
+            setattr(rama, nombre, valor)
+        return rama
+
+    def simular_dia_eventos(self, lam=0.0, minutos=18*60, llegadas=None):
+        """Igual que simular_dia pero salteando los minutos sin interacción (ver simular_por_eventos)."""
+        if self.metricas_pedidas <= METRICAS_SOLO_LLEGADAS:
+            self.simular_llegadas(lam, minutos, llegadas)
+            return
+        simular_por_eventos(self, lam, minutos, llegadas)
+
+    def minutos_salteables(self, tope: int) -> int:
+        """Minutos (hasta tope) que el modo por eventos puede saltear; ver minutos_libres."""
+        return minutos_libres(self, tope)
+
+    def saltar_minutos(self, minuto: int, salto: int):
+        """
+        Vuelo libre de los aviones en el aire durante salto minutos desde minuto, sin
+        control ni registro (solo se cuentan en las métricas). Con tiempo_exacto se
+        vuela con volar_exacto de a un minuto, como en los ticks, así posiciones,
+        toques y cruces quedan iguales (el salto sigue siendo seguro: sin pasarse de
+        los tramos, nadie toca la pista antes).
+        """
+        politica = getattr(self, "separacion", None)
+        tramos = None if politica is None else politica.tramos
+        vel_maxima = vel_maxima_permitida_por_tramo if tramos is None else tramos.maxima
+        aproximan = [a for a in self.cola.activos if a.estado in _SOLO_APROXIMANDO]
+        if self.tiempo_exacto:
+            for t in range(minuto, minuto + salto):
+                for avion in aproximan:
+                    # como hace el control en cada tick: máxima del tramo
+                    avion.velocidad = vel_maxima(avion.distancia)
+                    volar_exacto(avion, avion.distancia, t, cruces=self.cruces_tramo, tramos=tramos)
+        else:
+            for avion in aproximan:
+                avion.distancia, avion.velocidad = volar_libre(avion.distancia, salto, vel_maxima)
+        self.metricas.registrar_minutos_libres(salto)
+
+    def simular_llegadas(self, lam=0.0, minutos=18*60, llegadas=None):
+        """
+        Camino rápido cuando solo se piden métricas de llegadas: se sortean todas de
+        una vez y no se corre la aproximación. Los aviones quedan en self.aviones
+        (en su posición inicial). Sin sorteos de viento en el medio, con la misma
+        semilla da las mismas llegadas que simular_dia.
+        """
+        if llegadas is None:
+            llegadas = cronograma_llegadas(lam, minutos, self.rng_llegadas)
+        next_id = 1
+        for minuto, k in enumerate(_llegadas_por_minuto(llegadas, minutos)):
+            for _ in range(k):
+                next_id = self.agregar_avion(minuto, next_id)
+        self.metricas.n_aviones = next_id - 1
 
 
 
@@ -190,20 +1055,23 @@ class Simulador:
 # Clase Simulador con Viento
 # ======================
 class SimuladorViento(Simulador):
-    def __init__(self, seed=42):
-        super().__init__(seed)
+    ALEJANDOSE = ("REGRESANDO_DISTANCIA", "REGRESANDO_VIENTO")
+
+    def __init__(self, seed=42, nivel_registro="completo", flujos_separados=False, antitetico=False,
+                 metricas_pedidas=None, tiempo_exacto=False):
+        super().__init__(seed, nivel_registro, flujos_separados, antitetico, metricas_pedidas, tiempo_exacto)
 
     def controlar_regreso(self, avion, cola):
         # --- congestión normal ---
         if avion.distancia > RADAR_DIST:
             avion.estado = "DESVIADO"
             print(f" ❌ Avión {avion.id} se desvía a Montevideo.")
-        elif hay_gap_disponible(avion, cola):
+        elif self.cola.hay_gap(avion):
             avion.estado = "APROXIMANDO"
             print(f" ✅ Avión {avion.id} encuentra hueco y regresa a la fila.")
 
     def mover_aviones(self):
-        for avion in self.aviones.values():
+        for avion in self.cola.activos:
             if avion.estado in ("ATERRIZADO", "DESVIADO"):
                 continue
             delta = avion.velocidad / 60.0
@@ -213,21 +1081,21 @@ class SimuladorViento(Simulador):
                 avion.distancia -= delta
 
     def gestionar_finalizados(self, minuto: int, tiempo_ideal=23.4):
-        for avion in self.aviones.values():
+        for avion in self.cola.en_pista():
             if avion.estado in ("ATERRIZADO", "DESVIADO"):
                 continue
 
             if avion.distancia <= 0:
                 # --- 10% chance de go-around por viento ---
-                if self.rng.random() < 0.1:
+                if self.rng_viento.random() < 0.1:
                     avion.estado = "REGRESANDO_VIENTO"
                     avion.velocidad = 200  # kts
                     avion.distancia = 5    # reingresa a 5 nm
                     print(f" 🌬️ Avión {avion.id} aborta aterrizaje por viento y regresa.")
                 else:
                     avion.estado = "ATERRIZADO"
-                    avion.t_aterrizaje = minuto
-                    tiempo_real = minuto - avion.tiempo_llegada
+                    avion.t_aterrizaje = self.momento_toque(avion, minuto)
+                    tiempo_real = avion.t_aterrizaje - avion.tiempo_llegada
                     avion.retraso = max(0, tiempo_real - tiempo_ideal)
                     self.finalizados.append(avion)
 
@@ -237,15 +1105,18 @@ class SimuladorViento(Simulador):
 # Clase Simulador con Tormenta
 # ======================
 class SimuladorTormenta(Simulador):
-    def __init__(self, *, seed=42, t_inicio=600, duracion=30):
-        super().__init__(seed=seed)
+    ALEJANDOSE = ("REGRESANDO", "REGRESANDO_VIENTO", "REGRESANDO_TORMENTA")
+
+    def __init__(self, *, seed=42, t_inicio=600, duracion=30, nivel_registro="completo",
+                 flujos_separados=False, antitetico=False, metricas_pedidas=None, tiempo_exacto=False):
+        super().__init__(seed=seed, nivel_registro=nivel_registro, flujos_separados=flujos_separados,
+                         antitetico=antitetico, metricas_pedidas=metricas_pedidas, tiempo_exacto=tiempo_exacto)
         self.t_inicio = t_inicio
         self.t_fin = t_inicio + duracion
 
     def actualizar_estados(self, minuto: int):
         """Igual que Simulador, pero mantiene congestión"""
-        activos = [a for a in self.aviones.values() if a.estado not in ("ATERRIZADO", "DESVIADO")]
-        activos.sort(key=lambda av: av.distancia)
+        activos = self.cola.ordenar()
 
         for i, avion in enumerate(activos):
             if avion.estado.startswith("REGRESANDO"):
@@ -256,13 +1127,13 @@ class SimuladorTormenta(Simulador):
 
     def gestionar_finalizados(self, minuto: int, tiempo_ideal=23.4):
         """Si la tormenta está activa, no permite aterrizar."""
-        for avion in self.aviones.values():
+        for avion in self.cola.en_pista():
             if avion.estado in ("ATERRIZADO", "DESVIADO"):
                 continue
 
             if avion.distancia <= 0:
                 # Caso 1: aeropuerto cerrado → aborta
-                if self.t_inicio <= minuto < self.t_fin:
+                if self.t_inicio <= self.minuto_del_dia(minuto) < self.t_fin:
                     avion.estado = "REGRESANDO_TORMENTA"
                     avion.velocidad = 200  # nudos
                     avion.distancia = 5    # reinsertado a 5 mn
@@ -270,14 +1141,14 @@ class SimuladorTormenta(Simulador):
                 else:
                     # Caso 2: aeropuerto abierto → aterriza normal
                     avion.estado = "ATERRIZADO"
-                    avion.t_aterrizaje = minuto
-                    tiempo_real = minuto - avion.tiempo_llegada
+                    avion.t_aterrizaje = self.momento_toque(avion, minuto)
+                    tiempo_real = avion.t_aterrizaje - avion.tiempo_llegada
                     avion.retraso = max(0, tiempo_real - tiempo_ideal)
                     self.finalizados.append(avion)
 
     def mover_aviones(self):
         """Mueve también los que regresan por tormenta."""
-        for avion in self.aviones.values():
+        for avion in self.cola.activos:
             if avion.estado in ("ATERRIZADO", "DESVIADO"):
                 continue
             delta = avion.velocidad / 60.0
@@ -289,32 +1160,26 @@ class SimuladorTormenta(Simulador):
 # ======================
 # Clase Simulador con reintentos (para ej7parte1)
 # ======================
-class Simulador_con_reintentos:
-    def __init__(self, seed=42):
-        self.rng = np.random.default_rng(seed)
+class Simulador_con_reintentos(Simulador):
+    """
+    Simulador de ej7parte1: el que regresa y sale del radar vuelve a intentar
+    (ACERCANDOSE) hasta intentos_permitidos veces antes de desviarse. Todo lo demás
+    es lo de Simulador.
+    """
+
+    def __init__(self, seed=42, nivel_registro="completo", flujos_separados=False, antitetico=False,
+                 metricas_pedidas=None, tiempo_exacto=False, intentos_permitidos=1):
+        super().__init__(seed, nivel_registro, flujos_separados, antitetico, metricas_pedidas, tiempo_exacto)
         self.aviones: dict[int, Avion_con_reintentos] = {}
-        self.historial = []
         self.finalizados: List[Avion_con_reintentos] = []
         self.no_aterriza : List[int] = []
-        self.intentos_permitidos: int = 1 #modificar para experimentar con más intentos. No es relevante ya que aumentaría mucho el tiempo de atraso
+        self.intentos_permitidos: int = intentos_permitidos #más intentos aumentan mucho el tiempo de atraso
 
-    def generar_nuevo_avion(self, minuto: int, next_id: int, lam: float) -> int:
-        if self.rng.random() < lam:
-            avion = Avion_con_reintentos(next_id, minuto)
-            self.aviones[next_id] = avion
-            return next_id + 1
-        return next_id
-
-    def actualizar_estados(self, minuto: int):
-        activos = [a for a in self.aviones.values() if a.estado not in ("ATERRIZADO", "DESVIADO")]
-        activos.sort(key=lambda av: av.distancia)
-
-        for i, avion in enumerate(activos):
-            if avion.estado == "REGRESANDO":
-                self.controlar_regreso(avion, activos)
-            else:
-                lider = activos[i-1] if i > 0 and activos[i-1].estado != "REGRESANDO" else None
-                avion.controlar_aproximacion(lider)
+    def agregar_avion(self, minuto: int, next_id: int) -> int:
+        avion = Avion_con_reintentos(next_id, minuto)
+        self.aviones[next_id] = avion
+        self.cola.insertar(avion)
+        return next_id + 1
 
     def controlar_regreso(self, avion, cola): #MODIFICACIÓN PARA EJERCICIO 7
         if avion.distancia > RADAR_DIST and avion.intentos < self.intentos_permitidos:
@@ -324,49 +1189,9 @@ class Simulador_con_reintentos:
         elif avion.distancia > RADAR_DIST:
             #si ya probó las veces permitidas. Se va Montevideo.
             avion.estado = "DESVIADO"
-        elif hay_gap_disponible(avion, cola):
+        elif self.cola.hay_gap(avion):
             avion.estado = "APROXIMANDO"
 
-    def mover_aviones(self):
-        for avion in self.aviones.values():
-            if avion.estado in ("ATERRIZADO", "DESVIADO"):
-                continue
-            delta = avion.velocidad / 60.0
-            if avion.estado == "REGRESANDO":
-                avion.distancia += delta
-            else:
-                avion.distancia -= delta
-
-    def gestionar_finalizados(self, minuto: int, tiempo_ideal=23.4):
-        for avion in self.aviones.values():
-            if avion.estado in ("ATERRIZADO", "DESVIADO"):
-                continue
-            if avion.distancia <= 0:
-                avion.estado = "ATERRIZADO"
-                avion.t_aterrizaje = minuto
-                tiempo_real = minuto - avion.tiempo_llegada
-                avion.retraso = max(0, tiempo_real - tiempo_ideal)
-                self.finalizados.append(avion)
-
-    def guardar_estado(self, minuto: int):
-        for avion in self.aviones.values():
-            self.historial.append({
-                "minuto": minuto,
-                "id": avion.id,
-                "distancia": avion.distancia,
-                "velocidad": avion.velocidad,
-                "estado": avion.estado,
-            })
-
-    def simular_dia(self, lam: float, minutos=18*60):
-        next_id = 1
-        for minuto in range(minutos):
-            next_id = self.generar_nuevo_avion(minuto, next_id, lam)
-            self.actualizar_estados(minuto)
-            self.mover_aviones()
-            self.gestionar_finalizados(minuto)
-            self.guardar_estado(minuto)
-
 # ======================
 # Clase Avión con reintentos para ej7parte1
 # ======================
@@ -411,87 +1236,311 @@ class Avion_con_reintentos:
 
 
 # ======================
-# Video de una simulación: reconstruir las trayectorias de cada avión a partir de simulador.historial
+# Modo por eventos: saltea los minutos en que nadie interactúa
 # ======================
-import itertools
-def animate_simulation(simulador: Simulador, titulo_video: str):
+# Lo más que se puede achicar por minuto el hueco entre dos aviones en vuelo libre (nm)
+CIERRE_MAXIMO = (300 - 150) / 60.0
+# Con menos minutos hasta el próximo arribo no se busca salto: un minuto sin interacción
+# cuesta poco en ticks y no llega a pagar minutos_libres + saltar_minutos
+SALTO_MINIMO = 3
+
+
+def minutos_hasta_aterrizar(dist: float, vel_maxima=vel_maxima_permitida_por_tramo, tope=None) -> int:
+    """
+    Minuto (contando desde el próximo) en que un avión en vuelo libre toca la pista.
+    Con tope se deja de contar ahí: devuelve tope si no toca antes.
+    """
+    minutos = 0
+    while dist > 0 and minutos != tope:
+        dist -= vel_maxima(dist) / 60.0
+        minutos += 1
+    return minutos
+
+
+def volar_libre(dist: float, minutos: int, vel_maxima=vel_maxima_permitida_por_tramo) -> tuple:
+    """
+    Posición y velocidad tras minutos de vuelo libre. La velocidad es la máxima del
+    tramo al comienzo de cada minuto; se resta minuto a minuto (y no k * paso) para
+    que las posiciones coincidan exactamente con las de los ticks.
+    """
+    vel = vel_maxima(dist)
+    for _ in range(minutos):
+        vel = vel_maxima(dist)
+        dist -= vel / 60.0
+    return dist, vel
+
+
+def minutos_libres(sim, tope: int) -> int:
+    """
+    Cuántos minutos (hasta tope) se pueden saltear sin que cambie ningún estado:
+    todos los aviones en el aire APROXIMANDO, ninguno aterriza y ningún hueco puede
+    bajar de MIN_SEPARACION aunque el de atrás vaya a 300 kts y se cierre lo máximo.
+    Con un simulador que tiene su política (sim.separacion, ver escenarios) se usan
+    su separación mínima y sus tramos.
+
+    Corre después de cada tick del modo por eventos, así que lo común sale barato:
+    con alguien ajustando o regresando devuelve 0 sin mirar la cola, solo se ordena
+    si el movimiento la desordenó y solo se cuentan los minutos hasta la pista de
+    los que podrían tocarla antes de salto aun a la máxima de todos los tramos.
+    """
+    if tope <= 0:
+        return 0
+    activos = sim.cola.activos
+    for avion in reversed(activos):   # los que ajustan o regresan suelen estar al fondo
+        if avion.estado not in _SOLO_APROXIMANDO:
+            return 0
+    politica = getattr(sim, "separacion", None)
+    min_separacion = MIN_SEPARACION if politica is None else politica.min_separacion
+    tramos = None if politica is None else politica.tramos
+    if tramos is None:
+        vel_tope, cierre, vel_maxima = 300, CIERRE_MAXIMO, vel_maxima_permitida_por_tramo
+    else:
+        vel_tope, cierre, vel_maxima = max(tramos.vel_max), tramos.cierre_maximo, tramos.maxima
+    salto = tope
+    if len(activos) > 1:
+        distancias = [a.distancia for a in activos]
+        huecos = [d2 - d1 for d1, d2 in zip(distancias, distancias[1:])]
+        if min(huecos) < 0:
+            activos = sim.cola.ordenar()
+            distancias = [a.distancia for a in activos]
+            huecos = [d2 - d1 for d1, d2 in zip(distancias, distancias[1:])]
+        # el hueco más chico es el que antes puede bajar de la separación
+        salto = min(salto, math.floor((min(huecos) - min_separacion * vel_tope / 60.0) / cierre) + 1)
+        if salto <= 0:
+            return 0
+    for avion in activos:
+        # la cola está ordenada: del primero que ni a vel_tope llega en salto + 1 minutos, ninguno
+        if avion.distancia > (salto + 1) * vel_tope / 60.0:
+            break
+        salto = min(salto, minutos_hasta_aterrizar(avion.distancia, vel_maxima, tope=salto + 1) - 1)
+    return max(0, salto)
+
+
+def _llegadas_geometricas(rng, lam: float):
+    """Arribos de un Bernoulli(lam) por minuto (lam constante), sorteando la espera geométrica de a uno."""
+    if lam <= 0:
+        return
+    proxima = rng.geometric(lam) - 1
+    while True:
+        yield proxima
+        proxima += rng.geometric(lam)
+
+
+def simular_por_eventos(sim, lam, minutos=18*60, llegadas=None):
+    """
+    Modo por eventos para cualquier simulador de la familia.
+
+    - El próximo arribo se sortea directo con una geométrica: mismo proceso de
+      Bernoulli por minuto que generar_nuevo_avion, pero un sorteo por avión.
+      Con λ variable (arreglo por minuto o λ(t)) la espera deja de ser geométrica y
+      el día se sortea de una vez con cronograma_llegadas. Con llegadas (minutos de
+      arribo, como en simular_dia) se usan esas.
+    - Mientras haya control de separación (alguien ajustando, regresando o con el
+      hueco justo) se avanza de a un minuto con avanzar_minuto, como simular_dia.
+    - Si nadie interactúa y faltan al menos SALTO_MINIMO minutos para el próximo
+      arribo, se salta hasta ese arribo o el próximo aterrizaje: con los
+      tramos de velocidad fijos, la trayectoria de cada avión está determinada y se
+      aplica sin ordenar la cola, controlar separación ni registrar.
+
+    Como se sortea distinto, no reproduce minuto a minuto a simular_dia con la misma
+    semilla (la distribución es la misma). Los minutos salteados no se guardan en
+    sim.historial pero sí se cuentan en sim.metricas. Cuánto se saltea y cómo se
+    vuela lo deciden sim.minutos_salteables y sim.saltar_minutos.
+    """
+    if llegadas is None and (np.ndim(lam) != 0 or callable(lam)):
+        llegadas = cronograma_llegadas(lam, minutos, sim.rng_llegadas)
+    if llegadas is None:
+        proximas = _llegadas_geometricas(sim.rng_llegadas, lam)
+    else:
+        llegadas = np.sort(np.asarray(llegadas, dtype=np.int64))
+        proximas = iter(llegadas[llegadas >= 0].tolist())
+    # esto corre en cada tick: los métodos se buscan una vez y proxima queda acotada a minutos
+    avanzar_minuto, minutos_salteables = sim.avanzar_minuto, sim.minutos_salteables
+    next_id = 1
+    proxima = min(next(proximas, minutos), minutos)
+    minuto = 0
+    while minuto < minutos:
+        while minuto == proxima:
+            next_id = sim.agregar_avion(minuto, next_id)
+            proxima = min(next(proximas, minutos), minutos)
+        avanzar_minuto(minuto)
+        minuto += 1
+
+        if proxima - minuto >= SALTO_MINIMO:
+            salto = minutos_salteables(proxima - minuto)
+            if salto > 0:
+                sim.saltar_minutos(minuto, salto)
+                minuto += salto
+
+
+# ======================
+# Videos: matriz de cuadros y grabación con blitting
+# ======================
+def matriz_cuadros(historial: "RegistroTrayectorias", paso=1, t_inicio=None, t_fin=None) -> dict:
+    """
+    Posición y estado de todos los aviones en cada cuadro, armados de una vez.
+
+    - Los cuadros son los minutos t_inicio, t_inicio + paso, ... hasta t_fin
+      (por defecto, todo el día registrado).
+    - Un avión es visible entre su primer y su último minuto registrado; si hay
+      minutos salteados (modo por eventos) la distancia se interpola linealmente,
+      como hacía np.interp, y el estado es el del último registro.
+    - aterrizados / desviados: aviones que ya llegaron a ese estado en cada cuadro.
+
+    Devuelve {"minutos", "ids", "indice_color", "distancia" (cuadros × aviones, nan
+    si no es visible), "estado" (ídem, -1 si no es visible), "aterrizados", "desviados"}.
+    Solo se incluyen los aviones visibles en algún cuadro; indice_color es la
+    posición de cada uno entre todos los ids, para que el color no dependa de la ventana.
+    """
+    minuto = historial.minuto
+    if minuto.size == 0:
+        raise ValueError("el historial no tiene filas (nivel_registro 'off' o 'resumen')")
+    ids, col = np.unique(historial.id, return_inverse=True)
+    n_min = int(minuto.max()) + 1
+    t_inicio = 0 if t_inicio is None else max(0, int(t_inicio))
+    t_fin = n_min - 1 if t_fin is None else min(n_min - 1, int(t_fin))
+    cuadros = np.arange(t_inicio, t_fin + 1, paso)
+
+    dist = np.full((n_min, ids.size), np.nan)
+    est = np.full((n_min, ids.size), -1, dtype=np.int8)
+    dist[minuto, col] = historial.distancia
+    est[minuto, col] = historial.estado
+
+    # minuto registrado anterior y siguiente de cada avión en cada minuto
+    filas = np.arange(n_min)[:, None]
+    hay = est >= 0
+    previo = np.maximum.accumulate(np.where(hay, filas, -1), axis=0)[cuadros]
+    proximo = np.minimum.accumulate(np.where(hay, filas, n_min)[::-1], axis=0)[::-1][cuadros]
+    visible = (previo >= 0) & (proximo < n_min)
+
+    c = np.arange(ids.size)
+    p = np.clip(previo, 0, n_min - 1)
+    q = np.clip(proximo, 0, n_min - 1)
+    d_previo, d_proximo = dist[p, c], dist[q, c]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        frac = np.where(q > p, (cuadros[:, None] - p) / (q - p), 0.0)
+    distancia = np.where(visible, d_previo + (d_proximo - d_previo) * frac, np.nan)
+    estado = np.where(visible, est[p, c], -1).astype(np.int8)
+
+    aterrizados = np.logical_or.accumulate(est == EstadoAvion.ATERRIZADO, axis=0)[cuadros].sum(axis=1)
+    desviados = np.logical_or.accumulate(est == EstadoAvion.DESVIADO, axis=0)[cuadros].sum(axis=1)
+
+    quedan = visible.any(axis=0)
+    return {
+        "minutos": cuadros,
+        "ids": ids[quedan],
+        "indice_color": np.flatnonzero(quedan),
+        "distancia": distancia[:, quedan],
+        "estado": estado[:, quedan],
+        "aterrizados": aterrizados,
+        "desviados": desviados,
+    }
+
+
+def colores_aviones(indice_color: np.ndarray) -> np.ndarray:
+    """Paleta tab20 cíclica, un color RGBA por avión."""
+    paleta = np.array([(*rgb, 1.0) for rgb in plt.cm.tab20.colors])
+    return paleta[indice_color % len(paleta)]
+
+
+def cuadros_rgba(fig, dinamicos: list, actualizar, n_cuadros: int):
+    """
+    Dibuja el fondo estático una sola vez y, para cada cuadro, restaura el fondo,
+    llama a actualizar(k) y redibuja solo los artistas dinámicos (blitting).
+    Devuelve un generador de imágenes RGBA (alto × ancho × 4).
+    """
+    canvas = FigureCanvasAgg(fig)
+    for artista in dinamicos:
+        artista.set_animated(True)
+    canvas.draw()
+    fondo = canvas.copy_from_bbox(fig.bbox)
+    for k in range(n_cuadros):
+        canvas.restore_region(fondo)
+        actualizar(k)
+        for artista in dinamicos:
+            fig.draw_artist(artista)
+        yield np.asarray(canvas.buffer_rgba())
+
+
+def grabar_video(cuadros, ruta: str, fps: int):
+    """Manda los cuadros RGBA crudos por un pipe a ffmpeg (H.264)."""
+    cuadros = iter(cuadros)
+    primero = next(cuadros)
+    alto, ancho = primero.shape[:2]
+    comando = [
+        mpl.rcParams["animation.ffmpeg_path"], "-y", "-loglevel", "error",
+        "-f", "rawvideo", "-pix_fmt", "rgba", "-s", f"{ancho}x{alto}", "-r", str(fps), "-i", "-",
+        "-vf", "scale=trunc(iw/2)*2:trunc(ih/2)*2", "-vcodec", "libx264", "-pix_fmt", "yuv420p",
+        "-metadata", "artist=Simulación AEP", ruta,
+    ]
+    proceso = subprocess.Popen(comando, stdin=subprocess.PIPE)
+    try:
+        proceso.stdin.write(primero.tobytes())
+        for cuadro in cuadros:
+            proceso.stdin.write(cuadro.tobytes())
+    finally:
+        proceso.stdin.close()
+        proceso.wait()
+    if proceso.returncode != 0:
+        raise RuntimeError(f"ffmpeg terminó con código {proceso.returncode}")
+
+
+def _texto_tiempo(minuto: int) -> str:
+    horas, minutos = divmod(int(minuto), 60)
+    return f"{horas}h {minutos}min" if horas > 0 else f"{minutos}min"
+
+
+# ======================
+# Video de una simulación
+# ======================
+def animate_simulation(simulador: Simulador, titulo_video: str, paso=1, t_inicio=None, t_fin=None, fps=20):
     """
     Genera un video con las trayectorias de los aviones en la simulación.
     - Eje X: tiempo [min]
     - Eje Y: distancia a la pista [mn]
     - Cada avión = un punto con color propio.
+    - paso: un cuadro cada `paso` minutos; t_inicio/t_fin: ventana de tiempo
+      (p. ej. t_inicio=590, t_fin=640 para ver solo la tormenta).
     """
+    m = matriz_cuadros(simulador.historial, paso, t_inicio, t_fin)
+    colores = colores_aviones(m["indice_color"])
 
-    # reconstruimos trayectorias por avión
-    aviones = {}
-    for registro in simulador.historial:
-        aid = registro["id"]
-        if aid not in aviones:
-            aviones[aid] = {"t": [], "d": []}
-        aviones[aid]["t"].append(registro["minuto"])
-        aviones[aid]["d"].append(registro["distancia"])
-
-    fig, ax = plt.subplots(figsize=(10, 6))
+    fig = Figure(figsize=(10, 6))
+    ax = fig.add_subplot()
     ax.set_xlabel("Tiempo [min]")
     ax.set_ylabel("Distancia a pista [mn]")
     ax.set_ylim(0, 100)   # 0 = pista, 100 = radar
     ax.grid(True, linestyle="--", alpha=0.6)
+    ax.set_xlim(m["minutos"][0], max(m["minutos"][-1], m["minutos"][0] + 1))
 
-    tiempo_max = max(r["minuto"] for r in simulador.historial)
-    ax.set_xlim(0, tiempo_max)
+    puntos = ax.scatter([], [], s=36)
 
-    # paleta de colores (cíclica si hay muchos aviones)
-    colors = itertools.cycle(plt.cm.tab20.colors)
+    def actualizar(k):
+        y = m["distancia"][k]
+        visibles = np.flatnonzero(~np.isnan(y))
+        puntos.set_offsets(np.column_stack([np.full(visibles.size, m["minutos"][k]), y[visibles]]))
+        puntos.set_facecolors(colores[visibles])
 
-    scatters = {}
-    for aid in aviones.keys():
-        scatters[aid] = ax.plot([], [], "o", ms=6, color=next(colors))[0]
-
-    def update(frame):
-        for aid, datos in aviones.items():
-            t_arr = np.array(datos["t"])
-            d_arr = np.array(datos["d"])
-
-            if frame >= t_arr[0] and frame <= t_arr[-1]:
-                y = np.interp(frame, t_arr, d_arr)
-                scatters[aid].set_data([frame], [y])
-            else:
-                scatters[aid].set_data([], [])
-        return list(scatters.values())
-
-    anim = FuncAnimation(
-        fig, update,
-        frames=np.arange(0, tiempo_max+1, 1),
-        interval=100,
-        blit=False
-    )
-
-    writer = FFMpegWriter(fps=20, metadata=dict(artist='Simulación AEP'))
-    anim.save(f"{titulo_video}.mp4", writer=writer)
-    plt.close(fig)
+    grabar_video(cuadros_rgba(fig, [puntos], actualizar, m["minutos"].size), f"{titulo_video}.mp4", fps)
     return
 
 # ======================
 # Segundo video
 # ======================
-def animate_simulation_aviones(simulador: Simulador, titulo_video: str, Y_MAX=200):
+def animate_simulation_aviones(simulador: Simulador, titulo_video: str, Y_MAX=200,
+                               paso=1, t_inicio=None, t_fin=None, fps=15):
     """
     Visualización tipo planeo ideal:
     - X = distancia real a la pista [mn]
     - Y = altura ficticia: depende solo de la distancia (100 -> Y_MAX, 0 -> 0)
     - Si el avión retrocede en X, su altura sube de nuevo.
+    - paso, t_inicio y t_fin como en animate_simulation.
     """
+    m = matriz_cuadros(simulador.historial, paso, t_inicio, t_fin)
+    colores = colores_aviones(m["indice_color"])
 
-    aviones = {}
-    for registro in simulador.historial:
-        aid = registro["id"]
-        if aid not in aviones:
-            aviones[aid] = {"t": [], "d": [], "estado": []}
-        aviones[aid]["t"].append(registro["minuto"])
-        aviones[aid]["d"].append(registro["distancia"])
-        aviones[aid]["estado"].append(registro["estado"])
-
-    fig, ax = plt.subplots(figsize=(10, 6))
+    fig = Figure(figsize=(10, 6))
+    ax = fig.add_subplot()
     ax.set_xlabel("Distancia a pista [mn]")
     ax.set_xlim(100, 0)          # radar a pista
     ax.set_ylim(0, Y_MAX)        # altura ficticia
@@ -501,21 +1550,10 @@ def animate_simulation_aviones(simulador: Simulador, titulo_video: str, Y_MAX=20
     ax.text(101, Y_MAX, "Radar", va="bottom", ha="left", fontsize=10, color="black")
 
     ax.axhspan(0, Y_MAX, facecolor="skyblue", alpha=0.2)   # todo celeste
-   
-    tiempo_max = max(r["minuto"] for r in simulador.historial)
-    colors = itertools.cycle(plt.cm.tab20.colors)
-    scatters = {}
-
-    for aid in aviones:
-        color = next(colors)
-        scatters[aid] = ax.plot([], [], marker="$✈$", ms=12,
-                                color=color, linestyle="")[0]
 
-    # --- Contadores ---
-    aterrizados = set()
-    desviados = set()
+    aviones = ax.scatter([], [], marker="$✈$", s=144)
 
-    # Usamos fig.text (coordenadas relativas a la figura completa)
+    # --- Contadores (fig.text: coordenadas relativas a la figura completa) ---
     txt_aterrizados = fig.text(0.95, 0.035, "Aterrizados: 0",
                                ha="right", va="bottom",
                                fontsize=12, color="green", weight="bold")
@@ -526,48 +1564,18 @@ def animate_simulation_aviones(simulador: Simulador, titulo_video: str, Y_MAX=20
                           ha="center", va="top",
                           fontsize=13, color="blue", weight="bold")
 
-    def update(frame):
-        # --- actualizar posiciones de aviones ---
-        for aid, datos in aviones.items():
-            t_arr = np.array(datos["t"])
-            d_arr = np.array(datos["d"])
-            estado_arr = np.array(datos["estado"])
-
-            if frame >= t_arr[0] and frame <= t_arr[-1]:
-                x = np.interp(frame, t_arr, d_arr)
-                y = (x / 100) * Y_MAX
-                scatters[aid].set_data([x], [y])
-
-                # actualizar estado
-                idx = np.searchsorted(t_arr, frame, side="right") - 1
-                estado_actual = estado_arr[idx]
-                if estado_actual == "ATERRIZADO":
-                    aterrizados.add(aid)
-                elif estado_actual == "DESVIADO":
-                    desviados.add(aid)
-            else:
-                scatters[aid].set_data([], [])
-
-        # --- actualizar contadores ---
-        txt_aterrizados.set_text(f"Aterrizados: {len(aterrizados)}")
-        txt_desviados.set_text(f"Desviados: {len(desviados)}")
+    def actualizar(k):
+        x = m["distancia"][k]
+        visibles = np.flatnonzero(~np.isnan(x))
+        x = x[visibles]
+        aviones.set_offsets(np.column_stack([x, (x / 100) * Y_MAX]))
+        aviones.set_facecolors(colores[visibles])
+        aviones.set_edgecolors(colores[visibles])
 
-        horas, minutos = divmod(frame, 60)
-        if horas > 0:
-            txt_tiempo.set_text(f"{horas}h {minutos}min")
-        else:
-            txt_tiempo.set_text(f"{minutos}min")
+        txt_aterrizados.set_text(f"Aterrizados: {m['aterrizados'][k]}")
+        txt_desviados.set_text(f"Desviados: {m['desviados'][k]}")
+        txt_tiempo.set_text(_texto_tiempo(m["minutos"][k]))
 
-        return list(scatters.values()) + [txt_aterrizados, txt_desviados, txt_tiempo]
-    
-    anim = FuncAnimation(
-        fig, update,
-        frames=np.arange(0, tiempo_max+1, 1),
-        interval=200,
-        blit=False
-    )
-
-    writer = FFMpegWriter(fps=15, metadata=dict(artist='Simulación AEP'))
-    anim.save(f"{titulo_video}.mp4", writer=writer)
-    plt.close(fig)
-    return
\ No newline at end of file
+    dinamicos = [aviones, txt_aterrizados, txt_desviados, txt_tiempo]
+    grabar_video(cuadros_rgba(fig, dinamicos, actualizar, m["minutos"].size), f"{titulo_video}.mp4", fps)
+    return
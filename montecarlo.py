@@ -0,0 +1,467 @@
+import itertools
+from statistics import NormalDist
+
+import numpy as np
+
+from main import SimuladorTormenta, MIN_SEPARACION, VEL_RETROCESO
+from escenarios import SimuladorEscenario, PoliticaSeparacion, Reintentos
+from motor_vectorizado import semillas_replicas
+from perfilado import Perfilador, agregar_reportes
+from paralelo import (BLOQUES_POR_WORKER, sin_consola, tam_bloque_por_defecto, en_bloques, cantidad_workers,
+                      repartir, mapear_bloques)
+
+
+# ======================
+# Resumen compacto de una réplica
+# ======================
+CAMPOS_RESUMEN = ("atraso", "desvio", "congestion", "n_aviones", "aterrizados", "desviados")
+
+
+def resumen_replica(sim) -> tuple:
+    """
+    Métricas de un día ya simulado, en el orden de CAMPOS_RESUMEN.
+    Salen de sim.metricas, que se acumula en el loop: no hace falta historial.
+    """
+    valores = sim.metricas.valores()
+    return tuple(valores[campo] for campo in CAMPOS_RESUMEN)
+
+
+def _correr_bloque(clase, kwargs: dict, lam: float, semillas: list, minutos: int) -> list:
+    """Corre un bloque de réplicas en un worker y devuelve solo sus resúmenes."""
+    resumenes = []
+    with sin_consola():
+        for s in semillas:
+            sim = clase(seed=s, **{"nivel_registro": "off", **kwargs})
+            sim.simular_dia(lam, minutos=minutos)
+            resumenes.append(resumen_replica(sim))
+    return resumenes
+
+
+def _a_vectores(resumenes: list) -> dict:
+    columnas = np.array(resumenes, dtype=float).reshape(-1, len(CAMPOS_RESUMEN))
+    return {campo: columnas[:, j] for j, campo in enumerate(CAMPOS_RESUMEN)}
+
+
+# ======================
+# Runner paralelo
+# ======================
+def barrer_escenarios(escenarios: dict, lambdas, n_rep: int, seed=42,
+                      n_workers=None, tam_bloque=None, minutos=18*60, cache=None) -> dict:
+    """
+    Corre n_rep réplicas de cada escenario para cada λ repartiendo el trabajo en un
+    ProcessPoolExecutor.
+
+    - escenarios: {nombre: (clase, kwargs)}, p. ej.
+      {"tormenta": (SimuladorTormenta, {"t_inicio": 600, "duracion": 30})}.
+      La clase se construye como clase(seed=..., **kwargs); por defecto con
+      nivel_registro="off", porque las métricas se acumulan en sim.metricas.
+    - Las semillas salen de np.random.SeedSequence(seed).spawn(n_rep): la réplica r
+      usa la misma semilla en todas las celdas (escenario, λ), así las comparaciones
+      entre celdas quedan apareadas.
+    - Las réplicas se agrupan en bloques de tam_bloque para amortizar el pickling y
+      cada worker devuelve solo los resúmenes de CAMPOS_RESUMEN.
+    - cache: un CacheResultados opcional. Las réplicas ya guardadas de cada celda se
+      leen de disco y solo se corren las que faltan.
+
+    Como cada réplica depende solo de su semilla y los resultados se ubican por
+    índice, la salida es idéntica para cualquier n_workers (n_workers=1 corre en
+    el proceso actual, sin pool).
+
+    Devuelve {(nombre, λ): {campo: vector de largo n_rep}}.
+    """
+    n_workers = cantidad_workers(n_workers)
+    semillas = semillas_replicas(seed, n_rep)
+    if tam_bloque is None:
+        tam_bloque = tam_bloque_por_defecto(n_rep, n_workers, celdas=max(1, len(escenarios) * len(lambdas)))
+
+    resultados, claves, tareas = {}, {}, []
+    for nombre, (clase, kwargs) in escenarios.items():
+        for lam in lambdas:
+            previos = []
+            if cache is not None:
+                claves[(nombre, lam)] = cache.clave(clase, kwargs, lam, seed, minutos)
+                guardados = cache.leer(claves[(nombre, lam)])
+                if guardados is not None:
+                    previos = [tuple(fila) for fila in guardados[:n_rep].tolist()]
+            resultados[(nombre, lam)] = previos
+            tareas += [((nombre, lam), clase, kwargs, lam, semillas[i:i + tam_bloque])
+                       for i in range(len(previos), n_rep, tam_bloque)]
+
+    salidas = mapear_bloques(_correr_bloque, [(clase, kwargs, lam, bloque, minutos)
+                                              for _, clase, kwargs, lam, bloque in tareas], n_workers)
+
+    nuevos = set()
+    for (clave, *_), resumenes in zip(tareas, salidas):
+        resultados[clave].extend(resumenes)
+        nuevos.add(clave)
+    if cache is not None:
+        for clave in nuevos:
+            cache.guardar(claves[clave], np.array(resultados[clave], dtype=float))
+    return {clave: _a_vectores(res) for clave, res in resultados.items()}
+
+
+def correr_montecarlo(clase, lam: float, n_rep: int, seed=42, n_workers=None,
+                      tam_bloque=None, minutos=18*60, cache=None, **kwargs) -> dict:
+    """Réplicas de un solo escenario y λ. Devuelve {campo: vector de largo n_rep}."""
+    res = barrer_escenarios({"escenario": (clase, kwargs)}, [lam], n_rep, seed=seed,
+                            n_workers=n_workers, tam_bloque=tam_bloque, minutos=minutos,
+                            cache=cache)
+    return res[("escenario", lam)]
+
+
+def resumir(vectores: dict) -> dict:
+    """Media y error estándar por métrica, con las mismas claves que usan ej4/ej6."""
+    n = len(vectores["atraso"])
+    resumen = {}
+    for clave, campo in (("delay", "atraso"), ("div", "desvio"), ("cong", "congestion")):
+        x = vectores[campo]
+        resumen[f"{clave}_mean"] = np.mean(x)
+        resumen[f"{clave}_std"] = np.std(x) / np.sqrt(n)
+    return resumen
+
+
+# ======================
+# Estadísticos en línea y corte por precisión
+# ======================
+class EstadisticoEnLinea:
+    """Media y varianza muestral por el método de Welford, una observación a la vez."""
+
+    def __init__(self):
+        self.n = 0
+        self.media = 0.0
+        self._m2 = 0.0
+
+    def actualizar(self, x: float):
+        self.n += 1
+        delta = x - self.media
+        self.media += delta / self.n
+        self._m2 += delta * (x - self.media)
+
+    @property
+    def varianza(self) -> float:
+        return self._m2 / (self.n - 1) if self.n > 1 else float("inf")
+
+    def semiancho(self, confianza: float = 0.95) -> float:
+        """Semiancho del intervalo de confianza (normal) para la media."""
+        z = NormalDist().inv_cdf(0.5 + confianza / 2)
+        return z * np.sqrt(self.varianza / self.n) if self.n > 1 else float("inf")
+
+
+def correr_hasta_precision(clase, lam: float, objetivos: dict, seed=42, confianza=0.95,
+                           n_min=10, n_max=10_000, tam_ronda=None, n_workers=None,
+                           minutos=18*60, cache=None, **kwargs) -> dict:
+    """
+    Agrega réplicas hasta que el intervalo de confianza de cada KPI pedido sea más
+    angosto que su objetivo, p. ej. objetivos={"atraso": 0.5, "desvio": 0.01}.
+
+    Las réplicas se corren en rondas de tam_ronda (en paralelo, como en
+    barrer_escenarios) pero los estadísticos se actualizan de a una en orden de
+    réplica y se corta en la primera que cumple todos los objetivos (con al menos
+    n_min). Así el resultado no depende ni de n_workers ni del tamaño de ronda.
+    Con cache (CacheResultados) las réplicas ya guardadas no se vuelven a correr.
+
+    Devuelve {"n_rep", "alcanzado", "estadisticos": {campo: EstadisticoEnLinea},
+    "vectores": {campo: vector de largo n_rep}}.
+    """
+    desconocidos = set(objetivos) - set(CAMPOS_RESUMEN)
+    if desconocidos:
+        raise ValueError(f"KPIs desconocidos: {sorted(desconocidos)} (opciones: {CAMPOS_RESUMEN})")
+    n_workers = cantidad_workers(n_workers)
+    tam_ronda = tam_ronda or max(n_min, BLOQUES_POR_WORKER * n_workers)
+    tam_bloque = tam_bloque_por_defecto(tam_ronda, n_workers)
+
+    raiz = np.random.SeedSequence(seed)
+    estadisticos = {campo: EstadisticoEnLinea() for campo in CAMPOS_RESUMEN}
+    resumenes = []
+    alcanzado = False
+
+    guardados = []
+    if cache is not None:
+        clave = cache.clave(clase, kwargs, lam, seed, minutos)
+        previos = cache.leer(clave)
+        if previos is not None:
+            guardados = [tuple(fila) for fila in previos.tolist()]
+
+    with repartir(n_workers) as mapear:
+        while not alcanzado and len(resumenes) < n_max:
+            # spawn siempre, aunque la ronda venga del cache: así las semillas siguen en orden
+            inicio = len(resumenes)
+            semillas = raiz.spawn(min(tam_ronda, n_max - inicio))
+            salidas = [guardados[inicio:inicio + len(semillas)]]
+            faltan = semillas[len(salidas[0]):]
+            salidas += mapear(_correr_bloque, [(clase, kwargs, lam, b, minutos)
+                                               for b in en_bloques(faltan, tam_bloque)])
+
+            for resumen in (r for salida in salidas for r in salida):
+                resumenes.append(resumen)
+                for campo, x in zip(CAMPOS_RESUMEN, resumen):
+                    estadisticos[campo].actualizar(x)
+                if len(resumenes) >= n_min and all(
+                        estadisticos[c].semiancho(confianza) < h for c, h in objetivos.items()):
+                    alcanzado = True
+                    break
+
+    if cache is not None and len(resumenes) > len(guardados):
+        cache.guardar(clave, np.array(resumenes, dtype=float))
+
+    return {
+        "n_rep": len(resumenes),
+        "alcanzado": alcanzado,
+        "estadisticos": estadisticos,
+        "vectores": _a_vectores(resumenes),
+    }
+
+
+# ======================
+# Comparación apareada (números aleatorios comunes + antitéticas)
+# ======================
+def comparar_apareado(escenario_a: tuple, escenario_b: tuple, lam: float, n_rep: int, seed=42,
+                      antitetico=False, n_workers=None, minutos=18*60, cache=None) -> dict:
+    """
+    Diferencia b - a de cada KPI entre dos escenarios (clase, kwargs), con números
+    aleatorios comunes: los dos corren con flujos_separados=True y las mismas
+    semillas, así ven las mismas llegadas y la diferencia tiene mucha menos varianza
+    que comparando corridas independientes.
+
+    Con antitetico=True cada una de las n_rep semillas se corre dos veces (u y 1 - u)
+    y la unidad de análisis es el promedio del par.
+
+    Devuelve {campo: {"diferencia", "error_std", "error_std_independiente",
+    "reduccion_varianza", "diferencias"}}. error_std_independiente es el error que
+    se tendría con la misma cantidad de corridas sin aparear (varianzas de a y b por
+    separado); reduccion_varianza es el cociente de las dos varianzas, o sea cuántas
+    veces menos réplicas hacen falta para la misma precisión.
+    """
+    brazos = {}
+    for nombre, (clase, kwargs) in (("a", escenario_a), ("b", escenario_b)):
+        brazos[nombre] = (clase, {**kwargs, "flujos_separados": True})
+        if antitetico:
+            brazos[f"{nombre}_anti"] = (clase, {**kwargs, "flujos_separados": True, "antitetico": True})
+    res = barrer_escenarios(brazos, [lam], n_rep, seed=seed, n_workers=n_workers,
+                            minutos=minutos, cache=cache)
+    corridas_por_unidad = 2 if antitetico else 1
+
+    comparacion = {}
+    for campo in CAMPOS_RESUMEN:
+        a, b = res[("a", lam)][campo], res[("b", lam)][campo]
+        if antitetico:
+            a_anti, b_anti = res[("a_anti", lam)][campo], res[("b_anti", lam)][campo]
+            diferencias = ((b - a) + (b_anti - a_anti)) / 2
+            var_a = np.var(np.concatenate([a, a_anti]), ddof=1)
+            var_b = np.var(np.concatenate([b, b_anti]), ddof=1)
+        else:
+            diferencias = b - a
+            var_a, var_b = np.var(a, ddof=1), np.var(b, ddof=1)
+        var_apareada = np.var(diferencias, ddof=1)
+        var_independiente = (var_a + var_b) / corridas_por_unidad
+        comparacion[campo] = {
+            "diferencia": np.mean(diferencias),
+            "error_std": np.sqrt(var_apareada / n_rep),
+            "error_std_independiente": np.sqrt(var_independiente / n_rep),
+            "reduccion_varianza": var_independiente / var_apareada if var_apareada > 0 else float("inf"),
+            "diferencias": diferencias,
+        }
+    return comparacion
+
+
+# ======================
+# Perfilado de un lote
+# ======================
+def _perfilar_bloque(clase, kwargs: dict, lam: float, semillas: list, minutos: int) -> list:
+    reportes = []
+    with sin_consola():
+        for s in semillas:
+            sim = clase(seed=s, **{"nivel_registro": "off", **kwargs})
+            perfil = Perfilador(sim)
+            sim.simular_dia(lam, minutos=minutos)
+            reportes.append(perfil.reporte())
+    return reportes
+
+
+def perfilar_lote(clase, lam: float, n_rep: int, seed=42, n_workers=None,
+                  minutos=18*60, **kwargs) -> dict:
+    """
+    Corre n_rep réplicas con un Perfilador cada una (mismas semillas que
+    correr_montecarlo). Devuelve {"reportes": [uno por réplica], "agregado": ...}.
+    """
+    n_workers = cantidad_workers(n_workers)
+    bloques = en_bloques(semillas_replicas(seed, n_rep), tam_bloque_por_defecto(n_rep, n_workers))
+    salidas = mapear_bloques(_perfilar_bloque, [(clase, kwargs, lam, b, minutos) for b in bloques], n_workers)
+    reportes = [r for salida in salidas for r in salida]
+    return {"reportes": reportes, "agregado": agregar_reportes(reportes)}
+
+
+# ======================
+# Barrido de ventanas de tormenta con prefijo compartido
+# ======================
+def tormentas_por_fork(lam: float, ventanas, seed=42, minutos=18*60, **kwargs) -> dict:
+    """
+    Corre un mismo día (una semilla) para cada ventana (t_inicio, duracion) de
+    SimuladorTormenta compartiendo el tramo común: un simulador sin tormenta avanza
+    hasta cada t_inicio distinto y ahí se bifurca (fork) en una rama por ventana.
+    Cada rama da exactamente lo mismo que SimuladorTormenta(seed, t_inicio, duracion).
+
+    Devuelve {(t_inicio, duracion): sim.metricas.valores()}.
+    """
+    base = SimuladorTormenta(seed=seed, t_inicio=minutos, duracion=0, **{"nivel_registro": "off", **kwargs})
+    base.iniciar_dia(lam, minutos)
+    resultados = {}
+    for t_inicio in sorted({t for t, _ in ventanas}):
+        base.continuar(min(t_inicio, minutos))
+        for duracion in sorted({d for t, d in ventanas if t == t_inicio}):
+            rama = base.fork(t_inicio=t_inicio, t_fin=t_inicio + duracion)
+            rama.continuar(minutos)
+            resultados[(t_inicio, duracion)] = rama.metricas.valores()
+    return resultados
+
+
+def _tormentas_bloque(lam: float, ventanas: list, semillas: list, minutos: int, kwargs: dict) -> list:
+    return [tormentas_por_fork(lam, ventanas, s, minutos, **kwargs) for s in semillas]
+
+
+def barrer_tormentas(lam: float, ventanas, n_rep: int, seed=42, n_workers=None,
+                     minutos=18*60, **kwargs) -> dict:
+    """
+    Réplicas de tormentas_por_fork en paralelo, con las mismas semillas que
+    barrer_escenarios: {(t_inicio, duracion): {campo: vector de largo n_rep}}.
+    El costo por réplica es un prefijo compartido más los tramos distintos.
+    """
+    ventanas = [tuple(v) for v in ventanas]
+    n_workers = cantidad_workers(n_workers)
+    bloques = en_bloques(semillas_replicas(seed, n_rep), tam_bloque_por_defecto(n_rep, n_workers))
+    salidas = mapear_bloques(_tormentas_bloque, [(lam, ventanas, b, minutos, kwargs) for b in bloques], n_workers)
+    replicas = [r for salida in salidas for r in salida]
+    return {v: _a_vectores([tuple(r[v][c] for c in CAMPOS_RESUMEN) for r in replicas]) for v in ventanas}
+
+
+# ======================
+# Búsqueda de políticas: successive halving y racing
+# ======================
+PENALIDAD_DESVIO = 60.0   # minutos de atraso que equivalen a desviar a todos los aviones
+
+
+def costo_por_defecto(resumen: dict) -> float:
+    """Atraso promedio más PENALIDAD_DESVIO por la fracción de desviados."""
+    return resumen["atraso"] + PENALIDAD_DESVIO * resumen["desvio"]
+
+
+def grilla_politicas(min_separacion=(MIN_SEPARACION,), vel_retroceso=(VEL_RETROCESO,),
+                     intentos_permitidos=(0,), tramos=None, componentes=()) -> dict:
+    """
+    Todas las combinaciones de los parámetros como escenarios de SimuladorEscenario,
+    listas para buscar_politicas o barrer_escenarios: {nombre: (clase, kwargs)}.
+    tramos: {nombre: TramosVelocidad} (None = solo los de siempre). componentes
+    (p. ej. [Tormenta(600, 30)]) se agregan a todas; intentos_permitidos > 0 suma
+    Reintentos(intentos_permitidos).
+    """
+    tramos = tramos or {"base": None}
+    politicas = {}
+    for sep, retro, intentos, (nombre_tramos, t) in itertools.product(
+            min_separacion, vel_retroceso, intentos_permitidos, tramos.items()):
+        nombre = f"sep={sep}/retroceso={retro}/intentos={intentos}/tramos={nombre_tramos}"
+        extra = [Reintentos(intentos)] if intentos > 0 else []
+        politicas[nombre] = (SimuladorEscenario, {
+            "separacion": PoliticaSeparacion(min_separacion=sep, vel_retroceso=retro, tramos=t),
+            "componentes": list(componentes) + extra,
+        })
+    return politicas
+
+
+def _claramente_peor(diferencias: np.ndarray, confianza: float) -> bool:
+    """El intervalo de confianza de la media de diferencias (costo - costo del mejor) queda sobre 0."""
+    n = len(diferencias)
+    if n < 2:
+        return False
+    z = NormalDist().inv_cdf(0.5 + confianza / 2)
+    return np.mean(diferencias) - z * np.std(diferencias, ddof=1) / np.sqrt(n) > 0
+
+
+def buscar_politicas(politicas: dict, lambdas, seed=42, costo=costo_por_defecto, metodo="halving",
+                     n_inicial=8, eta=2, n_max=256, confianza=0.95, n_workers=None,
+                     minutos=18*60) -> dict:
+    """
+    Busca la política de menor costo sobre varios λ sin gastar n_max réplicas en
+    cada una: las claramente peores se descartan temprano y el presupuesto queda
+    para las que compiten.
+
+    - politicas: {nombre: (clase, kwargs)}, como en barrer_escenarios (ver
+      grilla_politicas). Todas corren con flujos_separados=True y las mismas
+      semillas: ven las mismas llegadas y las comparaciones quedan apareadas.
+    - El costo de una réplica es el promedio sobre lambdas de costo(métricas del
+      día), con costo una función de {campo de CAMPOS_RESUMEN: valor}.
+    - Por rondas: cada política viva se lleva a n réplicas (empezando en n_inicial
+      y multiplicando por eta hasta n_max), en paralelo en un ProcessPoolExecutor.
+      Con metodo="halving" (successive halving) siguen las ceil(vivas / eta) de
+      menor costo medio; con metodo="racing" se descarta toda política cuya
+      diferencia apareada de costo con la mejor tiene el intervalo de confianza
+      entero por encima de 0. Se corta con una sola viva o al llegar a n_max.
+
+    Las réplicas de cada política salen de SeedSequence(seed).spawn en orden, así
+    el resultado no depende de n_workers.
+
+    Devuelve {"mejor", "ranking": [(nombre, costo medio, semiancho, n_rep)] de las
+    que quedaron vivas, "descartadas": {nombre: n_rep al descartarla}, "rondas",
+    "costos": {nombre: vector por réplica}, "corridas": días simulados,
+    "corridas_grilla_completa": los que hubiera costado correr n_max de todas}.
+    """
+    if metodo not in ("halving", "racing"):
+        raise ValueError(f"metodo desconocido: {metodo!r} (opciones: 'halving', 'racing')")
+    if eta < 2:
+        raise ValueError("eta debe ser al menos 2")
+    lambdas = list(lambdas)
+    n_workers = cantidad_workers(n_workers)
+    semillas = semillas_replicas(seed, n_max)
+    brazos = {nombre: (clase, {**kwargs, "flujos_separados": True})
+              for nombre, (clase, kwargs) in politicas.items()}
+    resumenes = {(nombre, lam): [] for nombre in brazos for lam in lambdas}
+
+    def costos_de(nombre) -> np.ndarray:
+        por_lam = [[costo(dict(zip(CAMPOS_RESUMEN, r))) for r in resumenes[(nombre, lam)]]
+                   for lam in lambdas]
+        return np.mean(np.array(por_lam, dtype=float), axis=0)
+
+    vivas, descartadas, rondas = list(brazos), {}, []
+    n = min(n_inicial, n_max)
+    with repartir(n_workers) as mapear:
+        while True:
+            hechas = len(resumenes[(vivas[0], lambdas[0])])
+            tam_bloque = tam_bloque_por_defecto(n - hechas, n_workers, celdas=len(vivas) * len(lambdas))
+            tareas = [((nombre, lam), *brazos[nombre], lam, semillas[i:min(n, i + tam_bloque)])
+                      for nombre in vivas for lam in lambdas for i in range(hechas, n, tam_bloque)]
+            salidas = mapear(_correr_bloque, [(clase, kwargs, lam, bloque, minutos)
+                                              for _, clase, kwargs, lam, bloque in tareas])
+            for (clave, *_), salida in zip(tareas, salidas):
+                resumenes[clave].extend(salida)
+
+            costos = {nombre: costos_de(nombre) for nombre in vivas}
+            orden = sorted(vivas, key=lambda nombre: np.mean(costos[nombre]))
+            if metodo == "halving":
+                siguen = set(orden[:-(-len(vivas) // eta)])
+            else:
+                mejor = orden[0]
+                siguen = {nombre for nombre in vivas
+                          if not _claramente_peor(costos[nombre] - costos[mejor], confianza)}
+            rondas.append({"n_rep": n, "vivas": list(vivas),
+                           "descartadas": [nombre for nombre in vivas if nombre not in siguen]})
+            for nombre in rondas[-1]["descartadas"]:
+                descartadas[nombre] = n
+            vivas = [nombre for nombre in vivas if nombre in siguen]
+            if len(vivas) == 1 or n >= n_max:
+                break
+            n = min(n_max, n * eta)
+
+    z = NormalDist().inv_cdf(0.5 + confianza / 2)
+    todos = {nombre: costos_de(nombre) for nombre in brazos}
+    ranking = sorted(
+        ((nombre, float(np.mean(c)), float(z * np.std(c, ddof=1) / np.sqrt(len(c))) if len(c) > 1 else float("inf"),
+          len(c)) for nombre, c in todos.items() if nombre in vivas),
+        key=lambda fila: fila[1])
+    return {
+        "mejor": ranking[0][0],
+        "ranking": ranking,
+        "descartadas": descartadas,
+        "rondas": rondas,
+        "costos": todos,
+        "corridas": sum(len(r) for r in resumenes.values()),
+        "corridas_grilla_completa": n_max * len(brazos) * len(lambdas),
+    }
@@ -0,0 +1,493 @@
+import warnings
+from bisect import bisect_left, bisect_right
+
+import numpy as np
+
+from main import (
+    Avion,
+    EstadoAvion,
+    Simulador,
+    METRICAS_SOLO_LLEGADAS,
+    RADAR_DIST,
+    MIN_SEPARACION,
+    CIERRE_MAXIMO,
+    VEL_RETROCESO,
+    vel_maxima_permitida_por_tramo,
+    velocidad_minima_permitida_por_tramo,
+    aterrizaje_libre,
+    minutos_hasta_aterrizar,
+    perfil_lambda,
+    validar_metricas,
+    volar_libre,
+)
+from nucleo_jit import NUMBA_DISPONIBLE, paso_minuto
+
+
+# ======================
+# Tramos de velocidad en forma de tabla
+# ======================
+# Cortes (mn) de cerca a lejos: <=5 | (5, 15] | (15, 50] | >50
+CORTES_TRAMOS = np.array([5.0, 15.0, 50.0])
+VEL_MAX_TRAMO = np.array([150.0, 200.0, 250.0, 300.0])
+VEL_MIN_TRAMO = np.array([120.0, 150.0, 200.0, 250.0])
+
+# Códigos como int plano: acceder a miembros del IntEnum en el loop es caro
+APROXIMANDO = int(EstadoAvion.APROXIMANDO)
+AJUSTANDO = int(EstadoAvion.AJUSTANDO)
+REGRESANDO = int(EstadoAvion.REGRESANDO)
+DESVIADO = int(EstadoAvion.DESVIADO)
+ATERRIZADO = int(EstadoAvion.ATERRIZADO)
+# Los estados finales son los dos códigos más altos de EstadoAvion
+PRIMER_ESTADO_FINAL = DESVIADO
+
+
+def indice_tramo(dist: np.ndarray) -> np.ndarray:
+    """Índice del tramo de velocidad para cada distancia (0 = más cerca de la pista)."""
+    return np.searchsorted(CORTES_TRAMOS, dist, side="left")
+
+
+def vel_maxima_vectorizada(dist: np.ndarray) -> np.ndarray:
+    """Equivalente de vel_maxima_permitida_por_tramo sobre un arreglo."""
+    return VEL_MAX_TRAMO[indice_tramo(dist)]
+
+
+def vel_minima_vectorizada(dist: np.ndarray) -> np.ndarray:
+    """Equivalente de velocidad_minima_permitida_por_tramo sobre un arreglo."""
+    return VEL_MIN_TRAMO[indice_tramo(dist)]
+
+
+def separacion_con_lider(dist: np.ndarray, vel: np.ndarray) -> np.ndarray:
+    """
+    Separación temporal (min) de cada avión de la cola ordenada con el de adelante.
+    Igual que tiempo_entre_aviones: usa la velocidad propia y devuelve inf si es <= 0.
+    El primero de la cola no tiene líder y queda en inf.
+    """
+    sep = np.full(dist.size, np.inf)
+    if dist.size > 1:
+        v = vel[1:]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            sep[1:] = np.where(v > 0, ((dist[1:] - dist[:-1]) / v) * 60, np.inf)
+    return sep
+
+
+# ======================
+# Simulador vectorizado (structure-of-arrays)
+# ======================
+MOTORES = ("numpy", "jit")
+
+
+class SimuladorVectorizado(Simulador):
+    """
+    Misma dinámica que Simulador, pero con el estado de los aviones en arreglos.
+
+    - distancia, velocidad, estado (EstadoAvion) y tiempo_llegada viven en arreglos
+      indexados por id - 1, que crecen duplicando su capacidad.
+    - Separación, topes de velocidad, movimiento y aterrizajes se calculan de una vez.
+    - Solo los aviones cuya decisión depende de su líder (en conflicto o regresando)
+      se recorren en orden, como en Simulador.actualizar_estados.
+
+    Para una misma semilla da los mismos resultados que Simulador, también en el
+    modo por eventos. Al terminar simular_dia o simular_dia_eventos se reconstruyen
+    self.aviones y self.finalizados como objetos Avion.
+    El historial se escribe directo desde los arreglos al RegistroTrayectorias.
+    Los aviones terminan casi en orden de id: las cuentas de cada minuto miran solo
+    desde el primero que sigue en el aire (self.primero).
+
+    engine="jit" (el default) corre control, movimiento y aterrizajes con el núcleo
+    compilado de nucleo_jit.paso_minuto (un solo recorrido de la cola por minuto).
+    engine="numpy" queda como implementación de referencia: con las pocas decenas
+    de aviones que hay en el aire, cada operación de NumPy cuesta más por minuto
+    que el recorrido en Python de Simulador, así que es más lento que Simulador
+    (ver benchmarks.py). Si Numba no está instalado se avisa y se sigue con
+    engine="numpy"; los resultados son los mismos con cualquiera de los dos.
+    """
+
+    def __init__(self, seed=42, nivel_registro="completo", capacidad=64, engine="jit",
+                 flujos_separados=False, antitetico=False, metricas_pedidas=None):
+        if engine not in MOTORES:
+            raise ValueError(f"engine inválido: {engine!r} (opciones: {MOTORES})")
+        if engine == "jit" and not NUMBA_DISPONIBLE:
+            warnings.warn("Numba no está instalado: se usa engine='numpy', más lento que Simulador",
+                          RuntimeWarning, stacklevel=2)
+            engine = "numpy"
+        super().__init__(seed, nivel_registro, flujos_separados, antitetico, metricas_pedidas)
+        self.engine = engine
+        self.n = 0
+        self.distancia = np.empty(capacidad)
+        self.velocidad = np.empty(capacidad)
+        self.estado = np.empty(capacidad, dtype=np.int8)
+        self.tiempo_llegada = np.empty(capacidad, dtype=np.int64)
+        self.t_aterrizaje = np.full(capacidad, -1, dtype=np.int64)
+        self.retraso = np.zeros(capacidad)
+        self.orden_finalizados: list[int] = []
+        self.primero = 0             # índices anteriores: todos terminados
+        self.desviados_previos = 0   # desviados entre los índices anteriores a self.primero
+
+    def _asegurar_capacidad(self):
+        if self.n < self.distancia.size:
+            return
+        nueva = 2 * self.distancia.size
+        for nombre, relleno in (("distancia", 0.0), ("velocidad", 0.0), ("estado", 0),
+                                ("tiempo_llegada", 0), ("t_aterrizaje", -1), ("retraso", 0.0)):
+            viejo = getattr(self, nombre)
+            arr = np.full(nueva, relleno, dtype=viejo.dtype)
+            arr[:viejo.size] = viejo
+            setattr(self, nombre, arr)
+
+    def agregar_avion(self, minuto: int, next_id: int) -> int:
+        self._asegurar_capacidad()
+        i = self.n
+        self.distancia[i] = 100.0
+        self.velocidad[i] = 0.0
+        self.estado[i] = APROXIMANDO
+        self.tiempo_llegada[i] = minuto
+        self.t_aterrizaje[i] = -1
+        self.retraso[i] = 0.0
+        self.n += 1
+        return next_id + 1
+
+    def simular_dia_eventos(self, lam=0.0, minutos=18*60, llegadas=None):
+        super().simular_dia_eventos(lam, minutos, llegadas)
+        self.materializar()
+
+    def minutos_salteables(self, tope: int) -> int:
+        """Equivalente de minutos_libres sobre los arreglos."""
+        if tope <= 0:
+            return 0
+        orden = self.indices_activos()
+        if (self.estado[orden] != APROXIMANDO).any():
+            return 0
+        dist = self.distancia[orden]
+        salto = tope
+        if dist.size > 1:
+            hueco_seguro = MIN_SEPARACION * 300 / 60.0
+            salto = min(salto, int(np.floor((np.diff(dist) - hueco_seguro) / CIERRE_MAXIMO).min()) + 1)
+            if salto <= 0:
+                return 0
+        for d in dist.tolist():
+            salto = min(salto, minutos_hasta_aterrizar(d) - 1)
+        return max(0, salto)
+
+    def saltar_minutos(self, minuto: int, salto: int):
+        """Equivalente de Simulador.saltar_minutos: vuelo libre de los aviones en el aire."""
+        for i in self.indices_activos().tolist():
+            self.distancia[i], self.velocidad[i] = volar_libre(float(self.distancia[i]), salto)
+        self.metricas.registrar_minutos_libres(salto)
+
+    def indices_activos(self) -> np.ndarray:
+        """Índices de los aviones en el aire, ordenados por distancia (estable por id)."""
+        activos = np.flatnonzero(self.estado[self.primero:self.n] < PRIMER_ESTADO_FINAL) + self.primero
+        return activos[np.argsort(self.distancia[activos], kind="stable")]
+
+    def actualizar_estados(self, minuto: int):
+        if self.primero == self.n:
+            return
+        orden = self.indices_activos()
+        if orden.size == 0:
+            return
+
+        dist = self.distancia[orden]
+        vel = self.velocidad[orden]
+        est = self.estado[orden]
+
+        regresando = est == REGRESANDO
+        conflicto = separacion_con_lider(dist, vel) < MIN_SEPARACION
+        especiales = regresando | conflicto
+        if not especiales.any():
+            self.estado[orden] = APROXIMANDO
+            self.velocidad[orden] = vel_maxima_vectorizada(dist)
+            return
+
+        # Sin conflicto (o sin líder) la decisión es siempre APROXIMANDO a velocidad máxima.
+        # Los especiales se resuelven en orden sobre listas, como en Simulador.
+        nuevo_est = np.where(especiales, est, APROXIMANDO).tolist()
+        nueva_vel = np.where(especiales, vel, vel_maxima_vectorizada(dist)).tolist()
+        dist_l = dist.tolist()
+
+        for i in np.flatnonzero(especiales).tolist():
+            d = dist_l[i]
+            if regresando[i]:
+                self.controlar_regreso_idx(i, dist_l, nuevo_est)
+            elif nuevo_est[i - 1] == REGRESANDO:
+                nuevo_est[i] = APROXIMANDO
+                nueva_vel[i] = vel_maxima_permitida_por_tramo(d)
+            else:
+                v = nueva_vel[i - 1] - 20
+                if v < velocidad_minima_permitida_por_tramo(d):
+                    nuevo_est[i] = REGRESANDO
+                    nueva_vel[i] = VEL_RETROCESO
+                else:
+                    nuevo_est[i] = AJUSTANDO
+                    nueva_vel[i] = v
+
+        self.estado[orden] = nuevo_est
+        self.velocidad[orden] = nueva_vel
+
+    def avanzar_minuto(self, minuto: int):
+        if self.engine != "jit":
+            super().avanzar_minuto(minuto)
+            return
+        if self.primero < self.n:
+            self.paso_jit(minuto)
+        self.guardar_estado(minuto)
+
+    def paso_jit(self, minuto: int):
+        """Control, movimiento y aterrizajes de un minuto con nucleo_jit.paso_minuto."""
+        aterrizan, en_el_aire, consultas_gap = paso_minuto(
+            self.distancia, self.velocidad, self.estado, self.tiempo_llegada, self.t_aterrizaje,
+            self.retraso, self.primero, self.n, minuto, MIN_SEPARACION, VEL_RETROCESO, RADAR_DIST, 23.4)
+        self.contar_paso(en_el_aire, consultas_gap)
+        if aterrizan.size:
+            self.orden_finalizados.extend(aterrizan.tolist())
+            self.metricas.registrar_aterrizajes(self.retraso[aterrizan].tolist())
+
+    def contar_paso(self, en_el_aire: int, consultas_gap: int):
+        """Lo que recorrió el núcleo jit en un minuto; no hace nada salvo con un Perfilador."""
+
+    def controlar_regreso_idx(self, i: int, dist: list, est: list):
+        """Equivalente de controlar_regreso para la posición i de la cola ordenada."""
+        if dist[i] > RADAR_DIST:
+            est[i] = DESVIADO
+        elif self.hay_gap_idx(i, dist, est):
+            est[i] = APROXIMANDO
+
+    @staticmethod
+    def hay_gap_idx(i: int, dist: list, est: list) -> bool:
+        """Equivalente de hay_gap_disponible sobre la cola ordenada, con bisect sobre las distancias."""
+        pos = dist[i]
+        avance = aterrizaje_libre(pos, minutos=5)
+        for k in range(bisect_left(dist, pos - avance), bisect_right(dist, pos + avance)):
+            if est[k] <= AJUSTANDO:
+                return False
+        return True
+
+    def mover_aviones(self):
+        i, n = self.primero, self.n
+        if i == n:
+            return
+        d = self.distancia[i:n]
+        est = self.estado[i:n]
+        delta = self.velocidad[i:n] / 60.0
+        movido = np.where(est == REGRESANDO, d + delta, d - delta)
+        self.distancia[i:n] = np.where(est < PRIMER_ESTADO_FINAL, movido, d)
+
+    def gestionar_finalizados(self, minuto: int, tiempo_ideal=23.4):
+        i, n = self.primero, self.n
+        if i == n:
+            return
+        aterrizan = np.flatnonzero((self.estado[i:n] < PRIMER_ESTADO_FINAL) & (self.distancia[i:n] <= 0)) + i
+        if aterrizan.size == 0:
+            return
+        self.estado[aterrizan] = ATERRIZADO
+        self.t_aterrizaje[aterrizan] = minuto
+        tiempo_real = minuto - self.tiempo_llegada[aterrizan]
+        self.retraso[aterrizan] = np.maximum(0, tiempo_real - tiempo_ideal)
+        self.orden_finalizados.extend(aterrizan.tolist())
+        self.metricas.registrar_aterrizajes(self.retraso[aterrizan].tolist())
+
+    def guardar_estado(self, minuto: int):
+        n = self.n
+        estado = self.estado
+        while self.primero < n and estado[self.primero] >= PRIMER_ESTADO_FINAL:
+            self.desviados_previos += estado[self.primero] == DESVIADO
+            self.primero += 1
+        # AJUSTANDO y REGRESANDO solo aparecen desde self.primero: la congestión sale de la ventana
+        ventana = estado[self.primero:n]
+        desviados = self.desviados_previos
+        if ventana.size:
+            desviados += int(np.count_nonzero(ventana == DESVIADO))
+        self.metricas.registrar_minuto(ventana if ventana.size else None, n, int(desviados))
+        if self.historial.nivel != "off":
+            self.historial.registrar_arreglos(minuto, np.arange(1, n + 1), self.distancia[:n],
+                                              self.velocidad[:n], estado[:n])
+
+    def simular_dia(self, lam=0.0, minutos=18*60, llegadas=None):
+        super().simular_dia(lam, minutos, llegadas)
+        self.materializar()
+
+    def materializar(self):
+        """Reconstruye self.aviones y self.finalizados como objetos Avion."""
+        self.aviones = {}
+        for i in range(self.n):
+            avion = Avion(i + 1, int(self.tiempo_llegada[i]))
+            avion.distancia = float(self.distancia[i])
+            avion.velocidad = float(self.velocidad[i])
+            avion.estado = EstadoAvion(self.estado[i]).name
+            if self.t_aterrizaje[i] >= 0:
+                avion.t_aterrizaje = int(self.t_aterrizaje[i])
+                avion.retraso = float(self.retraso[i])
+            self.aviones[avion.id] = avion
+        self.finalizados = [self.aviones[i + 1] for i in self.orden_finalizados]
+
+
+# ======================
+# Simulación en lote: R días independientes a la vez (réplicas × aviones)
+# ======================
+# Códigos extra, solo para el lote: avión que todavía no llegó y relleno de la matriz
+NO_GENERADO = ATERRIZADO + 1
+RELLENO = ATERRIZADO + 2
+
+
+def semillas_replicas(seed, n_rep: int) -> list:
+    """SeedSequence independientes para cada réplica, derivadas de una sola semilla."""
+    return np.random.SeedSequence(seed).spawn(n_rep)
+
+
+def _actualizar_lote(dist: np.ndarray, vel: np.ndarray, est: np.ndarray):
+    """
+    Paso de control sobre una ventana (réplicas × aviones), modificada en el lugar.
+    Cada fila se ordena por distancia y la cola se recorre por columnas (posición
+    en la fila de aproximación), resolviendo todas las réplicas a la vez.
+    """
+    vivos = est < PRIMER_ESTADO_FINAL
+    n_vivos = vivos.sum(axis=1)
+    K = int(n_vivos.max())
+    if K == 0:
+        return
+    orden = np.argsort(np.where(vivos, dist, np.inf), axis=1, kind="stable")[:, :K]
+    valido = np.arange(K) < n_vivos[:, None]
+
+    d = np.take_along_axis(dist, orden, axis=1)
+    v = np.take_along_axis(vel, orden, axis=1)
+    e = np.take_along_axis(est, orden, axis=1)
+
+    sep = np.full(d.shape, np.inf)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        sep[:, 1:] = np.where(v[:, 1:] > 0, ((d[:, 1:] - d[:, :-1]) / v[:, 1:]) * 60, np.inf)
+
+    regresando = valido & (e == REGRESANDO)
+    especial = regresando | (valido & (sep < MIN_SEPARACION))
+    fijo = especial | ~valido
+    nuevo_e = np.where(fijo, e, APROXIMANDO).astype(np.int8)
+    nueva_v = np.where(fijo, v, vel_maxima_vectorizada(d))
+
+    # Columnas en orden: a la izquierda de k ya están los estados nuevos, como en Simulador
+    for k in np.flatnonzero(especial.any(axis=0)).tolist():
+        reg = np.flatnonzero(especial[:, k] & regresando[:, k])
+        if reg.size:
+            pos = d[reg, k]
+            fuera = pos > RADAR_DIST
+            nuevo_e[reg[fuera], k] = DESVIADO
+            reg, pos = reg[~fuera], pos[~fuera]
+            if reg.size:
+                avance = (vel_maxima_vectorizada(pos) / 60.0) * 5
+                dd = d[reg]
+                en_fila = (nuevo_e[reg] <= AJUSTANDO) & valido[reg]
+                ocupado = (en_fila
+                           & (dd >= (pos - avance)[:, None])
+                           & (dd <= (pos + avance)[:, None])).any(axis=1)
+                nuevo_e[reg[~ocupado], k] = APROXIMANDO
+
+        conf = np.flatnonzero(especial[:, k] & ~regresando[:, k])
+        if conf.size:
+            sin_lider = nuevo_e[conf, k - 1] == REGRESANDO
+            libres = conf[sin_lider]
+            nuevo_e[libres, k] = APROXIMANDO
+            nueva_v[libres, k] = vel_maxima_vectorizada(d[libres, k])
+
+            conf = conf[~sin_lider]
+            v_nueva = nueva_v[conf, k - 1] - 20
+            atras = v_nueva < vel_minima_vectorizada(d[conf, k])
+            nuevo_e[conf[atras], k] = REGRESANDO
+            nueva_v[conf[atras], k] = VEL_RETROCESO
+            nuevo_e[conf[~atras], k] = AJUSTANDO
+            nueva_v[conf[~atras], k] = v_nueva[~atras]
+
+    np.put_along_axis(est, orden, nuevo_e, axis=1)
+    np.put_along_axis(vel, orden, nueva_v, axis=1)
+
+
+def contar_llegadas(lam, n_rep: int, seed=42, minutos=60, tam_bloque=1_000_000) -> np.ndarray:
+    """
+    Cantidad de aviones que llegan en minutos, para n_rep réplicas a la vez: una sola
+    matriz de Bernoulli réplicas × minutos (por bloques de a lo sumo tam_bloque
+    elementos). lam puede ser constante, un arreglo por minuto o una función λ(t).
+
+    Es el camino para experimentos de conteo (ej3): no hay aviones ni aproximación.
+    Usa un único generador para todo el lote, así que la réplica r no coincide con
+    Simulador(seed=...); para eso está simular_dias(..., metricas_pedidas={"n_aviones"}).
+    """
+    rng = np.random.default_rng(seed)
+    perfil = perfil_lambda(lam, minutos)
+    filas = max(1, tam_bloque // max(1, minutos))
+    conteos = np.empty(n_rep, dtype=np.int64)
+    for i in range(0, n_rep, filas):
+        k = min(filas, n_rep - i)
+        conteos[i:i + k] = np.count_nonzero(rng.random((k, minutos)) < perfil, axis=1)
+    return conteos
+
+
+def simular_dias(lam: float, n_rep: int, seed=42, minutos=18*60, tiempo_ideal=23.4,
+                 metricas_pedidas=None) -> dict:
+    """
+    Simula n_rep días independientes en un solo recorrido, como matrices réplicas × aviones.
+    La réplica r da lo mismo que Simulador(seed=semillas_replicas(seed, n_rep)[r]).
+    Si metricas_pedidas solo incluye "n_aviones" se sortean las llegadas y no se
+    corre la aproximación.
+
+    Devuelve un dict de vectores de largo n_rep:
+    - "atraso": atraso promedio de los aterrizados (0 si no aterrizó ninguno)
+    - "desvio": fracción de aviones desviados
+    - "congestion": fracción de registros (avión, minuto) en AJUSTANDO o REGRESANDO,
+      la misma cuenta que hace ej4 sobre sim.historial
+    - "n_aviones", "aterrizados", "desviados": conteos por réplica
+    """
+    pedidas = validar_metricas(metricas_pedidas)
+    llegadas = np.zeros((n_rep, minutos), dtype=bool)
+    for r, s in enumerate(semillas_replicas(seed, n_rep)):
+        llegadas[r] = np.random.default_rng(s).random(minutos) < lam
+    n_aviones = llegadas.sum(axis=1)
+    if pedidas <= METRICAS_SOLO_LLEGADAS:
+        return {"n_aviones": n_aviones}
+    N = max(1, int(n_aviones.max(initial=0)))
+
+    dist = np.full((n_rep, N), 100.0)
+    vel = np.zeros((n_rep, N))
+    est = np.where(np.arange(N) < n_aviones[:, None], NO_GENERADO, RELLENO).astype(np.int8)
+    llegada = np.zeros((n_rep, N), dtype=np.int64)
+    retraso = np.zeros((n_rep, N))
+    contador = np.zeros(n_rep, dtype=np.int64)
+    cong_num = np.zeros(n_rep, dtype=np.int64)
+    cong_den = np.zeros(n_rep, dtype=np.int64)
+
+    lo = 0  # columnas a la izquierda de lo ya terminaron en todas las réplicas
+    for minuto in range(minutos):
+        nacen = np.flatnonzero(llegadas[:, minuto])
+        if nacen.size:
+            k = contador[nacen]
+            est[nacen, k] = APROXIMANDO
+            llegada[nacen, k] = minuto
+            contador[nacen] += 1
+        hi = int(contador.max(initial=0))
+        while lo < hi and np.all((est[:, lo] >= PRIMER_ESTADO_FINAL) & (est[:, lo] != NO_GENERADO)):
+            lo += 1
+        cong_den += contador
+        if lo >= hi:
+            continue
+
+        d, v, e = dist[:, lo:hi], vel[:, lo:hi], est[:, lo:hi]
+        _actualizar_lote(d, v, e)
+
+        vivos = e < PRIMER_ESTADO_FINAL
+        delta = v / 60.0
+        d[...] = np.where(vivos, np.where(e == REGRESANDO, d + delta, d - delta), d)
+
+        aterrizan = vivos & (d <= 0)
+        if aterrizan.any():
+            e[aterrizan] = ATERRIZADO
+            tiempo_real = minuto - llegada[:, lo:hi][aterrizan]
+            retraso[:, lo:hi][aterrizan] = np.maximum(0, tiempo_real - tiempo_ideal)
+
+        cong_num += ((e == AJUSTANDO) | (e == REGRESANDO)).sum(axis=1)
+
+    aterrizados = (est == ATERRIZADO).sum(axis=1)
+    desviados = (est == DESVIADO).sum(axis=1)
+    suma_atraso = np.where(est == ATERRIZADO, retraso, 0.0).sum(axis=1)
+    return {
+        "atraso": np.where(aterrizados > 0, suma_atraso / np.maximum(1, aterrizados), 0.0),
+        "desvio": desviados / np.maximum(1, n_aviones),
+        "congestion": cong_num / np.maximum(1, cong_den),
+        "n_aviones": n_aviones,
+        "aterrizados": aterrizados,
+        "desviados": desviados,
+    }
@@ -0,0 +1,128 @@
+import numpy as np
+
+from main import EstadoAvion
+
+try:
+    from numba import njit
+    NUMBA_DISPONIBLE = True
+except ImportError:  # sin Numba las funciones quedan como Python puro (sirven para verificar)
+    NUMBA_DISPONIBLE = False
+
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda f: f
+
+
+# Códigos como enteros planos: Numba los toma como constantes de compilación
+APROXIMANDO = int(EstadoAvion.APROXIMANDO)
+AJUSTANDO = int(EstadoAvion.AJUSTANDO)
+REGRESANDO = int(EstadoAvion.REGRESANDO)
+DESVIADO = int(EstadoAvion.DESVIADO)
+ATERRIZADO = int(EstadoAvion.ATERRIZADO)
+
+
+@njit(cache=True)
+def _vel_maxima(dist):
+    if dist > 50:
+        return 300.0
+    elif dist > 15:
+        return 250.0
+    elif dist > 5:
+        return 200.0
+    else:
+        return 150.0
+
+
+@njit(cache=True)
+def _vel_minima(dist):
+    if dist > 50:
+        return 250.0
+    elif dist > 15:
+        return 200.0
+    elif dist > 5:
+        return 150.0
+    else:
+        return 120.0
+
+
+@njit(cache=True)
+def paso_minuto(dist, vel, est, tiempo_llegada, t_aterrizaje, retraso, desde, n, minuto,
+                min_separacion, vel_retroceso, radar_dist, tiempo_ideal):
+    """
+    Control, movimiento y aterrizajes de un minuto sobre los arreglos de
+    SimuladorVectorizado (modificados en el lugar). Misma lógica que Simulador:
+    la cola se recorre en orden porque cada avión depende de la velocidad nueva
+    de su líder. Solo mira los índices desde .. n - 1 (los anteriores ya
+    terminaron). Devuelve los índices que aterrizaron, en orden de id, la
+    cantidad de aviones en el aire y la de búsquedas de hueco (para el Perfilador).
+    """
+    activos = np.empty(n - desde, dtype=np.int64)
+    k = 0
+    for i in range(desde, n):
+        if est[i] < DESVIADO:
+            activos[k] = i
+            k += 1
+    activos = activos[:k]
+    orden = activos[np.argsort(dist[activos], kind="mergesort")]
+    d = dist[orden]   # distancias del comienzo del minuto, ordenadas
+    consultas_gap = 0
+
+    # --- control de aproximación / regreso ---
+    for p in range(k):
+        i = orden[p]
+        if est[i] == REGRESANDO:
+            if d[p] > radar_dist:
+                est[i] = DESVIADO
+            else:
+                consultas_gap += 1
+                avance = (_vel_maxima(d[p]) / 60.0) * 5
+                lo = np.searchsorted(d, d[p] - avance, side="left")
+                hi = np.searchsorted(d, d[p] + avance, side="right")
+                libre = True
+                for q in range(lo, hi):
+                    if est[orden[q]] <= AJUSTANDO:
+                        libre = False
+                        break
+                if libre:
+                    est[i] = APROXIMANDO
+        elif p == 0 or est[orden[p - 1]] == REGRESANDO:
+            est[i] = APROXIMANDO
+            vel[i] = _vel_maxima(d[p])
+        else:
+            if vel[i] <= 0:
+                separacion = np.inf
+            else:
+                separacion = ((d[p] - d[p - 1]) / vel[i]) * 60
+            if separacion < min_separacion:
+                nueva_vel = vel[orden[p - 1]] - 20
+                if nueva_vel < _vel_minima(d[p]):
+                    est[i] = REGRESANDO
+                    vel[i] = vel_retroceso
+                else:
+                    est[i] = AJUSTANDO
+                    vel[i] = nueva_vel
+            else:
+                est[i] = APROXIMANDO
+                vel[i] = _vel_maxima(d[p])
+
+    # --- movimiento ---
+    for p in range(k):
+        i = orden[p]
+        if est[i] == REGRESANDO:
+            dist[i] = d[p] + vel[i] / 60.0
+        elif est[i] < DESVIADO:
+            dist[i] = d[p] - vel[i] / 60.0
+
+    # --- aterrizajes, en orden de id ---
+    aterrizan = np.empty(k, dtype=np.int64)
+    m = 0
+    for i in activos:
+        if est[i] < DESVIADO and dist[i] <= 0:
+            est[i] = ATERRIZADO
+            t_aterrizaje[i] = minuto
+            tiempo_real = minuto - tiempo_llegada[i]
+            retraso[i] = max(0.0, tiempo_real - tiempo_ideal)
+            aterrizan[m] = i
+            m += 1
+    return aterrizan[:m], k, consultas_gap
@@ -0,0 +1,61 @@
+import contextlib
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+
+# ======================
+# Reparto de bloques de réplicas entre procesos
+# ======================
+BLOQUES_POR_WORKER = 4   # para balancear la carga sin pagar mucho pickling
+
+
+@contextlib.contextmanager
+def sin_consola():
+    """Descarta lo que se imprima adentro: SimuladorViento imprime cada evento."""
+    with open(os.devnull, "w") as nulo, contextlib.redirect_stdout(nulo):
+        yield
+
+
+def tam_bloque_por_defecto(n: int, n_workers: int, celdas: int = 1) -> int:
+    """
+    Réplicas por bloque para que las celdas (escenario, λ) de n réplicas cada una
+    queden repartidas en unos BLOQUES_POR_WORKER bloques por worker.
+    """
+    bloques_por_celda = max(1, -(-BLOQUES_POR_WORKER * n_workers // celdas))
+    return max(1, -(-n // bloques_por_celda))
+
+
+def en_bloques(items: list, tam_bloque: int) -> list:
+    """items partido en bloques consecutivos de tam_bloque (el último puede ser más corto)."""
+    return [items[i:i + tam_bloque] for i in range(0, len(items), tam_bloque)]
+
+
+def cantidad_workers(n_workers=None) -> int:
+    """n_workers pedido, o todos los núcleos."""
+    return n_workers or os.cpu_count() or 1
+
+
+@contextlib.contextmanager
+def repartir(n_workers: int):
+    """
+    Da mapear(funcion, tareas), que devuelve [funcion(*tarea) for tarea in tareas] en
+    orden. Con n_workers=1 corre en el proceso actual, sin pool; si no, en un
+    ProcessPoolExecutor que dura todo el with, así las rondas de un mismo cálculo
+    reutilizan los procesos.
+    """
+    if n_workers == 1:
+        yield lambda funcion, tareas: [funcion(*tarea) for tarea in tareas]
+        return
+    with ProcessPoolExecutor(max_workers=n_workers) as pool:
+        def mapear(funcion, tareas):
+            futuros = [pool.submit(funcion, *tarea) for tarea in tareas]
+            return [f.result() for f in futuros]
+        yield mapear
+
+
+def mapear_bloques(funcion, tareas: list, n_workers: int) -> list:
+    """Una sola ronda de repartir: funcion(*tarea) por tarea, en orden."""
+    if not tareas:
+        return []
+    with repartir(n_workers) as mapear:
+        return mapear(funcion, tareas)
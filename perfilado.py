@@ -0,0 +1,156 @@
+import time
+
+from main import EstadoAvion, CODIGO_ESTADO
+
+
+# método del simulador -> fase del reporte
+FASES = {
+    "simular_dia": "dia",
+    "simular_dia_eventos": "dia",
+    "avanzar_minuto": "avanzar",
+    "generar_nuevo_avion": "generar",
+    "actualizar_estados": "actualizar",
+    "mover_aviones": "mover",
+    "mover_aviones_exacto": "mover",
+    "gestionar_finalizados": "finalizar",
+    "tocar_pista": "finalizar",
+    "paso_jit": "paso",
+    "guardar_estado": "registrar",
+}
+CONTADORES = ("ordenamientos", "aviones_ordenados", "cola_max", "consultas_gap", "go_arounds")
+
+
+class Perfilador:
+    """
+    Instrumentación opcional de un simulador: tiempo por fase y contadores.
+
+        sim = Simulador(seed=1)
+        perfil = Perfilador(sim)
+        sim.simular_dia(0.5)
+        perfil.reporte()
+
+    Envuelve, solo en esa instancia, los métodos de FASES que tenga el simulador
+    (y ordenar / hay_gap de su cola). Sin Perfilador no se toca nada: la clase y
+    los demás simuladores corren exactamente el mismo código que antes, sin costo.
+
+    Las fases se miden inclusivas: "dia" es el total y "avanzar" incluye a
+    actualizar, mover, finalizar y registrar. Con SimuladorVectorizado(engine="jit")
+    las tres primeras corren juntas en el núcleo compilado y se ven como "paso"; los
+    contadores de la cola los devuelve el núcleo. Contadores: ordenamientos de la cola,
+    aviones_ordenados (suma de tamaños), cola_max (pico de aviones en el aire),
+    consultas_gap y go_arounds (aviones que llegaron a la pista y no aterrizaron).
+    """
+
+    def __init__(self, sim):
+        self.sim = sim
+        self.fases = {fase: [0.0, 0] for fase in dict.fromkeys(FASES.values())}
+        self.contadores = dict.fromkeys(CONTADORES, 0)
+        self._instrumentar()
+
+    def _cronometrar(self, fase: str, metodo):
+        acumulado = self.fases[fase]
+        reloj = time.perf_counter
+
+        def envuelto(*args, **kwargs):
+            inicio = reloj()
+            try:
+                return metodo(*args, **kwargs)
+            finally:
+                acumulado[0] += reloj() - inicio
+                acumulado[1] += 1
+        return envuelto
+
+    def _instrumentar(self):
+        sim = self.sim
+        for nombre, fase in FASES.items():
+            metodo = getattr(sim, nombre, None)
+            if metodo is not None:
+                setattr(sim, nombre, self._cronometrar(fase, metodo))
+
+        contadores = self.contadores
+
+        def contar_orden(activos):
+            contadores["ordenamientos"] += 1
+            contadores["aviones_ordenados"] += len(activos)
+            contadores["cola_max"] = max(contadores["cola_max"], len(activos))
+            return activos
+
+        cola = getattr(sim, "cola", None)
+        if cola is not None:
+            ordenar, hay_gap = cola.ordenar, cola.hay_gap
+            cola.ordenar = lambda: contar_orden(ordenar())
+
+            def contar_gap(*args):
+                contadores["consultas_gap"] += 1
+                return hay_gap(*args)
+            cola.hay_gap = contar_gap
+
+        # motor vectorizado: la cola son índices y el hueco se busca con hay_gap_idx
+        if hasattr(sim, "indices_activos"):
+            indices_activos, hay_gap_idx = sim.indices_activos, sim.hay_gap_idx
+            sim.indices_activos = lambda: contar_orden(indices_activos())
+
+            def contar_gap_idx(*args):
+                contadores["consultas_gap"] += 1
+                return hay_gap_idx(*args)
+            sim.hay_gap_idx = contar_gap_idx
+
+        # núcleo jit: no pasa por indices_activos ni hay_gap_idx, cuenta él mismo
+        if hasattr(sim, "contar_paso"):
+            contar_paso = sim.contar_paso
+
+            def contar_nucleo(en_el_aire, consultas_gap):
+                contadores["ordenamientos"] += 1
+                contadores["aviones_ordenados"] += en_el_aire
+                contadores["cola_max"] = max(contadores["cola_max"], en_el_aire)
+                contadores["consultas_gap"] += consultas_gap
+                return contar_paso(en_el_aire, consultas_gap)
+            sim.contar_paso = contar_nucleo
+
+        # go-arounds: quien toca la pista y no queda ATERRIZADO
+        if hasattr(sim, "tocar_pista"):
+            tocar_pista = sim.tocar_pista
+
+            def contar_tocar_pista(avion, *args, **kwargs):
+                resultado = tocar_pista(avion, *args, **kwargs)
+                if CODIGO_ESTADO[avion.estado] != EstadoAvion.ATERRIZADO:
+                    contadores["go_arounds"] += 1
+                return resultado
+            sim.tocar_pista = contar_tocar_pista
+        elif cola is not None and hasattr(sim, "gestionar_finalizados"):
+            gestionar_finalizados = sim.gestionar_finalizados
+
+            def contar_finalizados(*args, **kwargs):
+                en_pista = cola.en_pista()
+                resultado = gestionar_finalizados(*args, **kwargs)
+                contadores["go_arounds"] += sum(
+                    CODIGO_ESTADO[a.estado] < EstadoAvion.DESVIADO for a in en_pista)
+                return resultado
+            sim.gestionar_finalizados = contar_finalizados
+
+    def reporte(self) -> dict:
+        """{"fases": {fase: {"segundos", "llamadas"}}, "contadores": {...}} (solo fases usadas)."""
+        return {
+            "fases": {fase: {"segundos": s, "llamadas": n} for fase, (s, n) in self.fases.items() if n},
+            "contadores": dict(self.contadores),
+        }
+
+
+def agregar_reportes(reportes: list) -> dict:
+    """
+    Suma los reportes de varias corridas (cola_max toma el máximo) y agrega, por
+    fase, la fracción del tiempo total ("dia") y los segundos promedio por corrida.
+    """
+    fases, contadores = {}, dict.fromkeys(CONTADORES, 0)
+    for reporte in reportes:
+        for fase, datos in reporte["fases"].items():
+            total = fases.setdefault(fase, {"segundos": 0.0, "llamadas": 0})
+            total["segundos"] += datos["segundos"]
+            total["llamadas"] += datos["llamadas"]
+        for nombre, valor in reporte["contadores"].items():
+            contadores[nombre] = max(contadores[nombre], valor) if nombre == "cola_max" else contadores[nombre] + valor
+    total_dia = fases.get("dia", {}).get("segundos", 0.0)
+    for datos in fases.values():
+        datos["por_corrida"] = datos["segundos"] / max(1, len(reportes))
+        datos["fraccion"] = datos["segundos"] / total_dia if total_dia > 0 else float("nan")
+    return {"corridas": len(reportes), "fases": fases, "contadores": contadores}
@@ -0,0 +1,245 @@
+import json
+import os
+
+import numpy as np
+
+from main import CODIGO_ESTADO, codigos_estado, perfil_lambda
+
+
+# ======================
+# Tablas en bloques de tamaño fijo sobre archivos memory-mapped
+# ======================
+TABLAS = {
+    "finalizados": {"id": np.int64, "tiempo_llegada": np.int64, "t_aterrizaje": np.float64,
+                    "retraso": np.float64, "estado": np.int8},
+    "trayectorias": {"minuto": np.int64, "id": np.int64, "distancia": np.float64,
+                     "velocidad": np.float64, "estado": np.int8},
+    "cruces": {"id": np.int64, "instante": np.float64, "limite": np.float64},
+    "dias": {"dia": np.int64, "llegadas": np.int64, "aterrizados": np.int64, "desviados": np.int64,
+             "suma_atraso": np.float64, "aviones_minuto": np.int64, "registros_congestion": np.int64},
+}
+TABLAS_DTYPE = {c: d for columnas in TABLAS.values() for c, d in columnas.items()}
+
+
+class TablaEnBloques:
+    """
+    Columnas que crecen por filas en archivos .npy de tam_bloque filas cada uno,
+    abiertos como memmap: en memoria queda a lo sumo el bloque que se está
+    escribiendo, sin importar cuántas filas se agreguen.
+    """
+
+    def __init__(self, directorio: str, columnas: dict, tam_bloque: int):
+        self.directorio = directorio
+        self.columnas = columnas
+        self.tam_bloque = tam_bloque
+        self.n_filas = 0
+        self._bloque = None   # {columna: memmap} del bloque actual
+        os.makedirs(directorio, exist_ok=True)
+
+    def _ruta(self, columna: str, k: int) -> str:
+        return os.path.join(self.directorio, f"{columna}_{k:05d}.npy")
+
+    def _abrir_bloque(self, k: int):
+        self.cerrar()
+        self._bloque = {
+            columna: np.lib.format.open_memmap(self._ruta(columna, k), mode="w+",
+                                               dtype=dtype, shape=(self.tam_bloque,))
+            for columna, dtype in self.columnas.items()
+        }
+
+    def agregar(self, **valores):
+        """Agrega filas: una secuencia por columna, todas del mismo largo."""
+        valores = {c: np.asarray(valores[c]) for c in self.columnas}
+        n = len(next(iter(valores.values())))
+        hecho = 0
+        while hecho < n:
+            k, pos = divmod(self.n_filas, self.tam_bloque)
+            if pos == 0:
+                self._abrir_bloque(k)
+            cuantas = min(n - hecho, self.tam_bloque - pos)
+            for columna, arr in self._bloque.items():
+                arr[pos:pos + cuantas] = valores[columna][hecho:hecho + cuantas]
+            hecho += cuantas
+            self.n_filas += cuantas
+
+    def cerrar(self):
+        if self._bloque is not None:
+            for arr in self._bloque.values():
+                arr.flush()
+            self._bloque = None
+
+
+class LectorTabla:
+    """Lee una tabla escrita por TablaEnBloques sin cargarla entera."""
+
+    def __init__(self, directorio: str, columnas: list, n_filas: int, tam_bloque: int):
+        self.directorio = directorio
+        self.columnas = columnas
+        self.n_filas = n_filas
+        self.tam_bloque = tam_bloque
+
+    def __len__(self):
+        return self.n_filas
+
+    def bloques(self, columnas=None):
+        """Genera {columna: memmap de solo lectura} bloque por bloque."""
+        columnas = columnas or self.columnas
+        for k in range(-(-self.n_filas // self.tam_bloque)):
+            filas = min(self.tam_bloque, self.n_filas - k * self.tam_bloque)
+            yield {c: np.load(os.path.join(self.directorio, f"{c}_{k:05d}.npy"), mmap_mode="r")[:filas]
+                   for c in columnas}
+
+    def columna(self, nombre: str) -> np.ndarray:
+        """Una columna entera en memoria (las demás no se leen)."""
+        partes = [b[nombre] for b in self.bloques([nombre])]
+        return np.concatenate(partes) if partes else np.empty(0, dtype=TABLAS_DTYPE.get(nombre, float))
+
+
+class ResultadoPeriodo:
+    """
+    Resultados de simular_periodo leídos desde su directorio:
+    - finalizados: una fila por avión terminado (estado: código de EstadoAvion,
+      t_aterrizaje = -1 si se desvió)
+    - trayectorias: una fila por avión en el aire y minuto (si se guardaron)
+    - cruces: cruces de límite de tramo (solo con tiempo_exacto)
+    - dias: KPIs de cada día de operación
+    """
+
+    def __init__(self, directorio: str):
+        with open(os.path.join(directorio, "meta.json"), encoding="utf-8") as f:
+            self.meta = json.load(f)
+        for nombre, columnas in TABLAS.items():
+            lector = LectorTabla(os.path.join(directorio, nombre), list(columnas),
+                                 self.meta["filas"].get(nombre, 0), self.meta["tam_bloque"])
+            setattr(self, nombre, lector)
+
+    def kpis_diarios(self) -> dict:
+        """
+        {"atraso", "desvio", "congestion", "llegadas"} por día (vectores de largo dias).
+        La congestión de cada día es la fracción de aviones-minuto en el aire que
+        estuvieron ajustando o regresando.
+        """
+        d = {c: self.dias.columna(c) for c in TABLAS["dias"]}
+        return {
+            "atraso": np.where(d["aterrizados"] > 0, d["suma_atraso"] / np.maximum(1, d["aterrizados"]), 0.0),
+            "desvio": d["desviados"] / np.maximum(1, d["llegadas"]),
+            "congestion": d["registros_congestion"] / np.maximum(1, d["aviones_minuto"]),
+            "llegadas": d["llegadas"],
+        }
+
+
+# ======================
+# Simulación de largo plazo
+# ======================
+def purgar_finalizados(sim) -> list:
+    """
+    Saca de memoria los aviones ya archivados por la cola (terminados y contados en
+    sim.metricas) y los devuelve. Los totales siguen bien porque guardar_estado
+    suma sim.purgados y sim.aterrizados_purgados.
+    """
+    terminados = sim.cola.archivo
+    if not terminados:
+        return []
+    sim.cola.archivo = []
+    for avion in terminados:
+        del sim.aviones[avion.id]
+    sim.purgados += len(terminados)
+    sim.aterrizados_purgados += len(sim.finalizados)
+    sim.finalizados = []
+    return terminados
+
+
+def _columnas_aviones(aviones: list) -> dict:
+    n = len(aviones)
+    return {
+        "id": np.fromiter((a.id for a in aviones), dtype=np.int64, count=n),
+        "distancia": np.fromiter((a.distancia for a in aviones), dtype=float, count=n),
+        "velocidad": np.fromiter((a.velocidad for a in aviones), dtype=float, count=n),
+        "estado": codigos_estado(aviones),
+    }
+
+
+def simular_periodo(sim, dias: int, lam, directorio: str, minutos_operacion=18*60,
+                    minutos_dia=24*60, tam_bloque=2**16, guardar_trayectorias=True) -> ResultadoPeriodo:
+    """
+    Operación continua durante dias días con memoria acotada.
+
+    - Cada día llegan aviones durante minutos_operacion (6:00 a 24:00) según lam
+      (constante, arreglo por minuto o λ(t) con t en minutos desde la apertura); el
+      resto del día no hay arribos pero los que están en el aire siguen volando.
+    - El tiempo es continuo: el minuto m del día d es d * minutos_dia + m. Las
+      perturbaciones con horario (SimuladorTormenta, Tormenta) miran el minuto del
+      día (sim.minuto_del_dia), así se repiten todos los días.
+    - En memoria quedan solo los aviones en el aire. Cada minuto los terminados se
+      agregan a directorio/finalizados y (si guardar_trayectorias) las posiciones
+      de los que vuelan a directorio/trayectorias, en bloques memory-mapped de
+      tam_bloque filas. Con tiempo_exacto los cruces de tramo también se vuelcan
+      minuto a minuto a directorio/cruces. Al cerrar cada día se guardan sus KPIs
+      en directorio/dias.
+
+    Funciona con los simuladores de objetos Avion creados con nivel_registro="off";
+    sim.metricas acumula los KPIs de todo el período. Devuelve un ResultadoPeriodo
+    (también se puede abrir después con ResultadoPeriodo(directorio)).
+    """
+    if sim.historial.nivel != "off":
+        raise ValueError("simular_periodo guarda las trayectorias en disco: crear el simulador con nivel_registro='off'")
+    if not hasattr(sim, "cola") or not hasattr(sim.cola, "archivo"):
+        raise TypeError("simular_periodo necesita un simulador de objetos Avion (no el vectorizado)")
+    perfil = np.zeros(minutos_dia)
+    perfil[:minutos_operacion] = perfil_lambda(lam, minutos_operacion)
+
+    tablas = {nombre: TablaEnBloques(os.path.join(directorio, nombre), columnas, tam_bloque)
+              for nombre, columnas in TABLAS.items()}
+    meta = {"dias": 0, "minutos_dia": minutos_dia, "minutos_operacion": minutos_operacion,
+            "tam_bloque": tam_bloque, "filas": {}}
+
+    def escribir_meta():
+        meta["filas"] = {nombre: tabla.n_filas for nombre, tabla in tablas.items()}
+        with open(os.path.join(directorio, "meta.json"), "w", encoding="utf-8") as f:
+            json.dump(meta, f, indent=2)
+
+    sim.minutos_dia = minutos_dia
+    m = sim.metricas
+    next_id = 1
+    try:
+        for dia in range(dias):
+            previo = (m.n_aviones, m.aterrizados, m.desviados, m.suma_atraso, m.registros_congestion)
+            aviones_minuto = 0
+            llegadas = (sim.rng_llegadas.random(minutos_dia) < perfil).tolist()
+            for minuto_dia, llega in enumerate(llegadas):
+                minuto = dia * minutos_dia + minuto_dia
+                if llega:
+                    next_id = sim.agregar_avion(minuto, next_id)
+                sim.avanzar_minuto(minuto)
+                aviones_minuto += len(sim.cola.activos)
+
+                if guardar_trayectorias and (sim.cola.activos or sim.cola.archivo):
+                    columnas = _columnas_aviones(sim.cola.activos + sim.cola.archivo)
+                    tablas["trayectorias"].agregar(minuto=np.full(len(columnas["id"]), minuto), **columnas)
+                if sim.cruces_tramo:
+                    ids, instantes, limites = zip(*sim.cruces_tramo)
+                    tablas["cruces"].agregar(id=ids, instante=instantes, limite=limites)
+                    sim.cruces_tramo.clear()
+                terminados = purgar_finalizados(sim)
+                if terminados:
+                    tablas["finalizados"].agregar(
+                        id=[a.id for a in terminados],
+                        tiempo_llegada=[a.tiempo_llegada for a in terminados],
+                        t_aterrizaje=[-1 if a.t_aterrizaje is None else a.t_aterrizaje for a in terminados],
+                        retraso=[float(a.retraso) for a in terminados],
+                        estado=[CODIGO_ESTADO[a.estado] for a in terminados],
+                    )
+
+            actual = (m.n_aviones, m.aterrizados, m.desviados, m.suma_atraso, m.registros_congestion)
+            llegadas_dia, aterrizados, desviados, suma_atraso, congestion = (
+                a - b for a, b in zip(actual, previo))
+            tablas["dias"].agregar(dia=[dia], llegadas=[llegadas_dia], aterrizados=[aterrizados],
+                                   desviados=[desviados], suma_atraso=[suma_atraso],
+                                   aviones_minuto=[aviones_minuto], registros_congestion=[congestion])
+            meta["dias"] = dia + 1
+            escribir_meta()
+    finally:
+        for tabla in tablas.values():
+            tabla.cerrar()
+        escribir_meta()
+    return ResultadoPeriodo(directorio)
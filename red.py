@@ -0,0 +1,163 @@
+import copy
+
+from main import Simulador, EstadoAvion, CODIGO_ESTADO, perfil_lambda
+from motor_vectorizado import semillas_replicas
+from periodo import purgar_finalizados
+from paralelo import sin_consola, cantidad_workers, repartir
+
+
+# ======================
+# Aeropuerto de la red
+# ======================
+class Aeropuerto:
+    """
+    Un nodo de la red: su simulador (clase(seed=..., **kwargs), como en
+    barrer_escenarios, con sus propias perturbaciones), su demanda lam y a dónde
+    manda los desviados.
+
+    - alternativa: nombre del aeropuerto que recibe sus desvíos (None: salen de la red).
+    - demora: minutos de vuelo hasta la alternativa. El avión reaparece allá, en el
+      borde del radar, demora minutos después de desviarse, y entra a la cola como
+      un arribo más.
+    """
+
+    def __init__(self, nombre: str, lam, alternativa=None, demora=30, clase=Simulador, **kwargs):
+        self.nombre = nombre
+        self.lam = lam
+        self.alternativa = alternativa
+        self.demora = demora
+        self.clase = clase
+        self.kwargs = kwargs
+        # estado durante simular_red
+        self.sim = None
+        self.perfil = None
+        self.next_id = 1
+        self.pendientes = []   # (minuto de llegada, desvíos previos) de los que vienen en camino
+        self.saltos = {}       # id local -> desvíos previos, solo de los recibidos
+        self.recibidos = 0
+        self.enviados = 0
+        self.perdidos = 0
+
+    def iniciar(self, seed, minutos: int):
+        self.sim = self.clase(seed=seed, **{**self.kwargs, "nivel_registro": "off"})
+        if not hasattr(self.sim.cola, "archivo"):
+            raise TypeError("la red necesita simuladores de objetos Avion (no el vectorizado)")
+        self.perfil = perfil_lambda(self.lam, minutos).tolist()
+
+    def avanzar(self, desde: int, hasta: int, max_saltos: int) -> list:
+        """
+        Corre los minutos desde .. hasta - 1. Los terminados se sacan de memoria
+        (purgar_finalizados) y de los desviados se devuelven los que pasan a otro
+        aeropuerto como (destino, minuto de llegada, desvíos acumulados).
+        """
+        sim = self.sim
+        self.pendientes.sort()
+        salientes = []
+        k = 0
+        for minuto in range(desde, hasta):
+            while k < len(self.pendientes) and self.pendientes[k][0] == minuto:
+                self.saltos[self.next_id] = self.pendientes[k][1]
+                self.next_id = sim.agregar_avion(minuto, self.next_id)
+                self.recibidos += 1
+                k += 1
+            self.next_id = sim.generar_nuevo_avion(minuto, self.next_id, self.perfil[minuto])
+            sim.avanzar_minuto(minuto)
+
+            for avion in purgar_finalizados(sim):
+                saltos = self.saltos.pop(avion.id, 0)
+                if CODIGO_ESTADO[avion.estado] != EstadoAvion.DESVIADO:
+                    continue
+                if self.alternativa is None or saltos >= max_saltos:
+                    self.perdidos += 1
+                else:
+                    self.enviados += 1
+                    salientes.append((self.alternativa, minuto + self.demora, saltos + 1))
+        del self.pendientes[:k]
+        return salientes
+
+    def resumen(self) -> dict:
+        return {
+            **self.sim.metricas.valores(),
+            "recibidos": self.recibidos,
+            "enviados": self.enviados,
+            "perdidos": self.perdidos,
+            "en_transito": len(self.pendientes),
+            "en_el_aire": len(self.sim.cola.activos),
+        }
+
+
+def _avanzar_grupo(aeropuertos: list, desde: int, hasta: int, max_saltos: int) -> tuple:
+    """Avanza en un worker los aeropuertos que le tocan y devuelve su estado y los desvíos."""
+    with sin_consola():
+        salientes = [s for aeropuerto in aeropuertos for s in aeropuerto.avanzar(desde, hasta, max_saltos)]
+    return aeropuertos, salientes
+
+
+# ======================
+# Simulación de la red
+# ======================
+def simular_red(aeropuertos: list, seed=42, minutos=18*60, max_saltos=1, n_workers=None) -> dict:
+    """
+    Simula un día de varios aeropuertos a la vez, pasando los desviados de cada uno
+    a su alternativa.
+
+    - Cada aeropuerto tiene su semilla (SeedSequence(seed).spawn) y sortea sus
+      propios arribos con su λ (constante, arreglo por minuto o λ(t)).
+    - Un avión que se desvía con menos de max_saltos desvíos previos aparece en la
+      alternativa demora minutos después; si no, o si no hay alternativa, sale de
+      la red (perdidos).
+    - Sincronización conservadora: un desvío no puede llegar a otro aeropuerto antes
+      de la menor demora de la red, así que todos avanzan esa ventana de minutos
+      sin comunicarse (repartidos en un ProcessPoolExecutor) y recién al final de
+      la ventana se entregan los desvíos.
+
+    Como cada aeropuerto depende solo de su semilla y de los desvíos que recibe, el
+    resultado es idéntico para cualquier n_workers (n_workers=1 corre en el proceso
+    actual, sin pool). Cada ventana manda el estado de los aeropuertos a los workers
+    y de vuelta: con pocos aviones por aeropuerto y ventanas cortas suele convenir
+    n_workers=1. Los aeropuertos que se pasan no se modifican.
+
+    Devuelve {"aeropuertos": {nombre: métricas + recibidos, enviados, perdidos,
+    en_transito, en_el_aire}, "red": totales, "simuladores": {nombre: sim}}.
+    """
+    aeropuertos = copy.deepcopy(list(aeropuertos))
+    nombres = [a.nombre for a in aeropuertos]
+    if len(set(nombres)) != len(nombres):
+        raise ValueError("hay aeropuertos con el mismo nombre")
+    for a in aeropuertos:
+        if a.alternativa is not None:
+            if a.alternativa not in nombres:
+                raise ValueError(f"alternativa desconocida para {a.nombre}: {a.alternativa!r}")
+            if a.demora < 1:
+                raise ValueError(f"la demora hasta la alternativa de {a.nombre} debe ser de al menos 1 minuto")
+    ventana = min((a.demora for a in aeropuertos if a.alternativa is not None), default=minutos)
+
+    for a, s in zip(aeropuertos, semillas_replicas(seed, len(aeropuertos))):
+        a.iniciar(s, minutos)
+
+    n_workers = max(1, min(cantidad_workers(n_workers), len(aeropuertos)))
+    grupos = [aeropuertos[i::n_workers] for i in range(n_workers)]
+    with repartir(n_workers) as mapear:
+        for desde in range(0, minutos, ventana):
+            hasta = min(minutos, desde + ventana)
+            salidas = mapear(_avanzar_grupo, [(grupo, desde, hasta, max_saltos) for grupo in grupos])
+
+            grupos = [grupo for grupo, _ in salidas]
+            por_nombre = {a.nombre: a for grupo in grupos for a in grupo}
+            for _, salientes in salidas:
+                for destino, minuto, saltos in salientes:
+                    por_nombre[destino].pendientes.append((minuto, saltos))
+
+    por_nombre = {a.nombre: a for grupo in grupos for a in grupo}
+    resumenes = {nombre: por_nombre[nombre].resumen() for nombre in nombres}
+    totales = {campo: sum(r[campo] for r in resumenes.values())
+               for campo in ("n_aviones", "aterrizados", "recibidos", "enviados", "perdidos",
+                             "en_transito", "en_el_aire")}
+    originados = totales["n_aviones"] - totales["recibidos"]
+    totales["originados"] = originados
+    totales["desvio_red"] = totales["perdidos"] / originados if originados else 0.0
+    return {
+        "aeropuertos": resumenes,
+        "red": totales,
+        "simuladores": {nombre: por_nombre[nombre].sim for nombre in nombres},
+    }
@@ -0,0 +1,24 @@
+from main import Simulador
+from cache_resultados import version_codigo
+
+CUADERNO = """
+from main import Simulador
+
+class MiSim(Simulador):
+    def controlar_regreso(self, avion, cola):
+        if avion.distancia > {radar}:
+            avion.estado = "DESVIADO"
+"""
+
+
+def clase_de_cuaderno(radar):
+    # como una celda de notebook: sin archivo fuente para inspect.getsource
+    espacio = {"__name__": "cuaderno_sin_fuente"}
+    exec(compile(CUADERNO.format(radar=radar), "<celda>", "exec"), espacio)
+    return espacio["MiSim"]
+
+
+def test_version_cambia_al_editar_una_clase_sin_fuente():
+    assert version_codigo(clase_de_cuaderno(100)) == version_codigo(clase_de_cuaderno(100))
+    assert version_codigo(clase_de_cuaderno(100)) != version_codigo(clase_de_cuaderno(80))
+    assert version_codigo(clase_de_cuaderno(100)) != version_codigo(Simulador)
@@ -0,0 +1,37 @@
+from main import TramosVelocidad
+from escenarios import APROXIMANDO, REGRESANDO, PoliticaSeparacion, SimuladorEscenario
+
+# a 30 mn la máxima pasa de 250 a 350 kts: la ventana del hueco va de ±20.8 a ±29.2 mn
+RAPIDOS = TramosVelocidad(vel_max=(400, 350, 300, 150))
+
+
+def estado_tras_buscar_hueco(tramos):
+    sim = SimuladorEscenario(seed=0, separacion=PoliticaSeparacion(tramos=tramos))
+    sim.agregar_avion(0, 1)
+    sim.agregar_avion(0, 2)
+    regresa, adelante = sim.aviones[1], sim.aviones[2]
+    regresa.distancia, regresa.estado = 30.0, REGRESANDO
+    adelante.distancia = 5.0
+    sim.cola.ordenar()
+    sim.controlar_regreso(regresa, regresa.distancia)
+    return regresa.estado
+
+
+def test_hueco_con_tramos_de_siempre():
+    assert estado_tras_buscar_hueco(None) == APROXIMANDO
+
+
+def test_hueco_usa_los_tramos_de_la_politica():
+    assert estado_tras_buscar_hueco(RAPIDOS) == REGRESANDO
+
+
+def test_tramos_none_igual_a_los_de_siempre_explicitos():
+    # None va por vel_maxima_permitida_por_tramo / velocidad_minima_permitida_por_tramo
+    rapido = SimuladorEscenario(seed=3, nivel_registro="off", separacion=PoliticaSeparacion())
+    generico = SimuladorEscenario(seed=3, nivel_registro="off",
+                                  separacion=PoliticaSeparacion(tramos=TramosVelocidad()))
+    rapido.simular_dia(0.5)
+    generico.simular_dia(0.5)
+    assert rapido.metricas.valores() == generico.metricas.valores()
+    assert [(a.distancia, a.velocidad, a.estado) for a in rapido.aviones.values()] == \
+        [(a.distancia, a.velocidad, a.estado) for a in generico.aviones.values()]
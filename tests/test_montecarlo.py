@@ -0,0 +1,25 @@
+import numpy as np
+import pytest
+
+from main import Simulador, SimuladorTormenta, SimuladorViento
+from escenarios import SimuladorEscenario, Viento
+from montecarlo import barrer_escenarios
+
+ESCENARIOS = {
+    "base": (Simulador, {}),
+    "tormenta": (SimuladorTormenta, {"t_inicio": 60, "duracion": 30}),
+    "viento": (SimuladorViento, {}),
+    "escenario": (SimuladorEscenario, {"componentes": [Viento()]}),
+}
+
+
+@pytest.mark.parametrize("tam_bloque", [None, 2])
+@pytest.mark.parametrize("n_workers", [2, 3])
+def test_barrer_escenarios_no_depende_de_n_workers(n_workers, tam_bloque):
+    kwargs = dict(lambdas=[0.1, 0.4], n_rep=5, seed=3, tam_bloque=tam_bloque, minutos=180)
+    serie = barrer_escenarios(ESCENARIOS, n_workers=1, **kwargs)
+    paralelo = barrer_escenarios(ESCENARIOS, n_workers=n_workers, **kwargs)
+    assert serie.keys() == paralelo.keys()
+    for celda, vectores in serie.items():
+        for campo, vector in vectores.items():
+            assert np.array_equal(paralelo[celda][campo], vector), (celda, campo)
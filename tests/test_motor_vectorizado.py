@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+
+from main import CODIGO_ESTADO, Simulador
+from motor_vectorizado import NUMBA_DISPONIBLE, SimuladorVectorizado, semillas_replicas, simular_dias
+
+MOTORES = ["numpy", pytest.param("jit", marks=pytest.mark.skipif(not NUMBA_DISPONIBLE, reason="sin Numba"))]
+
+
+def aviones(sim):
+    return [(a.id, a.tiempo_llegada, a.distancia, a.velocidad, CODIGO_ESTADO[a.estado], a.t_aterrizaje, a.retraso)
+            for a in sim.aviones.values()]
+
+
+def filas_historial(historial):
+    # dentro de un minuto el vectorizado registra por id y Simulador en el orden de la cola
+    filas = zip(historial.minuto.tolist(), historial.id.tolist(), historial.distancia.tolist(),
+                historial.velocidad.tolist(), historial.estado.tolist())
+    return sorted(filas)
+
+
+@pytest.mark.parametrize("engine", MOTORES)
+@pytest.mark.parametrize("nivel", ["completo", "activos"])
+@pytest.mark.parametrize("lam", [0.1, 0.5])
+@pytest.mark.parametrize("seed", [0, 1])
+def test_vectorizado_igual_a_simulador(engine, nivel, lam, seed):
+    base = Simulador(seed=seed, nivel_registro=nivel)
+    base.simular_dia(lam)
+    vectorizado = SimuladorVectorizado(seed=seed, nivel_registro=nivel, engine=engine)
+    vectorizado.simular_dia(lam)
+    assert aviones(vectorizado) == aviones(base)
+    assert [a.id for a in vectorizado.finalizados] == [a.id for a in base.finalizados]
+    assert vectorizado.metricas.valores() == pytest.approx(base.metricas.valores())
+    assert filas_historial(vectorizado.historial) == filas_historial(base.historial)
+    assert np.array_equal(vectorizado.historial.conteos, base.historial.conteos)
+
+
+@pytest.mark.parametrize("engine", MOTORES)
+@pytest.mark.parametrize("lam", [0.05, 0.3])
+def test_vectorizado_eventos_igual_a_simulador(engine, lam):
+    base = Simulador(seed=4, nivel_registro="off")
+    base.simular_dia_eventos(lam)
+    vectorizado = SimuladorVectorizado(seed=4, nivel_registro="off", engine=engine)
+    vectorizado.simular_dia_eventos(lam)
+    assert aviones(vectorizado) == aviones(base)
+    assert vectorizado.metricas.valores() == pytest.approx(base.metricas.valores())
+
+
+@pytest.mark.parametrize("lam", [0.1, 0.5])
+def test_simular_dias_igual_a_simulador_por_replica(lam):
+    n_rep = 4
+    lote = simular_dias(lam, n_rep, seed=11)
+    for r, semilla in enumerate(semillas_replicas(11, n_rep)):
+        sim = Simulador(seed=semilla, nivel_registro="off")
+        sim.simular_dia(lam)
+        valores = sim.metricas.valores()
+        for campo, vector in lote.items():
+            assert vector[r] == pytest.approx(valores[campo]), (r, campo)
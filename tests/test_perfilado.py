@@ -0,0 +1,46 @@
+from main import SimuladorTormenta
+from motor_vectorizado import SimuladorVectorizado
+from perfilado import Perfilador
+
+
+def dia_hasta(minuto, perfilar=False):
+    sim = SimuladorTormenta(seed=1, t_inicio=600, duracion=30)
+    perfil = Perfilador(sim) if perfilar else None
+    sim.iniciar_dia(0.5)
+    sim.continuar(minuto)
+    return sim, perfil
+
+
+def test_fork_de_un_simulador_perfilado_avanza_la_rama():
+    base, perfil = dia_hasta(300, perfilar=True)
+    n_base = len(base.aviones)
+    rama = base.fork(t_inicio=400, t_fin=460)
+    rama.continuar(18*60)
+
+    assert base.minuto == 300 and len(base.aviones) == n_base
+    assert perfil.reporte()["fases"]["avanzar"]["llamadas"] == 300
+
+    esperado = dia_hasta(300)[0].fork(t_inicio=400, t_fin=460)
+    esperado.continuar(18*60)
+    assert rama.metricas.valores() == esperado.metricas.valores()
+
+
+def test_snapshot_de_un_simulador_perfilado():
+    sim, _ = dia_hasta(200, perfilar=True)
+    estado = sim.snapshot()
+    assert "avanzar_minuto" not in estado
+    assert "ordenar" not in vars(estado["cola"])
+    sim.continuar(400)
+    sim.restaurar(estado)
+    assert sim.minuto == 200
+
+
+def test_contadores_del_nucleo_jit():
+    contadores = {}
+    for engine in ("numpy", "jit"):
+        sim = SimuladorVectorizado(seed=1, engine=engine)
+        perfil = Perfilador(sim)
+        sim.simular_dia(0.5)
+        contadores[engine] = perfil.reporte()["contadores"]
+    assert contadores["jit"]["consultas_gap"] > 0
+    assert contadores["jit"] == contadores["numpy"]
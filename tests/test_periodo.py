@@ -0,0 +1,25 @@
+import numpy as np
+
+from main import Simulador, SimuladorTormenta
+from escenarios import SimuladorEscenario, Tormenta
+from periodo import simular_periodo
+
+
+def kpis(sim, directorio):
+    return simular_periodo(sim, 3, 0.3, str(directorio), guardar_trayectorias=False).kpis_diarios()
+
+
+def test_la_tormenta_se_repite_todos_los_dias(tmp_path):
+    sin = kpis(Simulador(seed=4, nivel_registro="off"), tmp_path / "sin")
+    for i, sim in enumerate([SimuladorTormenta(seed=4, t_inicio=300, duracion=60, nivel_registro="off"),
+                             SimuladorEscenario(seed=4, componentes=[Tormenta(300, 60)], nivel_registro="off")]):
+        con = kpis(sim, tmp_path / f"con{i}")
+        assert np.all(con["desvio"] > sin["desvio"])
+
+
+def test_los_cruces_de_tramo_van_a_disco(tmp_path):
+    sim = Simulador(seed=4, nivel_registro="off", tiempo_exacto=True)
+    resultado = simular_periodo(sim, 2, 0.2, str(tmp_path), guardar_trayectorias=False)
+    assert sim.cruces_tramo == []
+    assert len(resultado.cruces) > 0
+    assert set(np.unique(resultado.cruces.columna("limite"))) <= {50.0, 15.0, 5.0}
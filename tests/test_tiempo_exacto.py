@@ -0,0 +1,37 @@
+import numpy as np
+import pytest
+
+from main import CODIGO_ESTADO, Simulador, cronograma_llegadas
+from escenarios import SimuladorEscenario
+
+
+def resumen(sim):
+    return (
+        [(a.id, a.distancia, a.velocidad, CODIGO_ESTADO[a.estado], a.t_aterrizaje, a.retraso)
+         for a in sim.aviones.values()],
+        sim.cruces_tramo,
+    )
+
+
+@pytest.mark.parametrize("exacto", [False, True])
+@pytest.mark.parametrize("lam", [0.1, 0.3, 0.6])
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_escenario_igual_a_simulador(seed, lam, exacto):
+    base = Simulador(seed=seed, tiempo_exacto=exacto)
+    base.simular_dia(lam)
+    escenario = SimuladorEscenario(seed=seed, tiempo_exacto=exacto)
+    escenario.simular_dia(lam)
+    assert resumen(escenario) == resumen(base)
+    assert escenario.metricas.valores() == base.metricas.valores()
+
+
+@pytest.mark.parametrize("clase", [Simulador, SimuladorEscenario])
+@pytest.mark.parametrize("lam", [0.05, 0.3])
+@pytest.mark.parametrize("seed", [0, 1])
+def test_eventos_exacto_igual_a_ticks(clase, seed, lam):
+    llegadas = cronograma_llegadas(lam, rng=np.random.default_rng(seed))
+    ticks = clase(seed=seed, tiempo_exacto=True)
+    ticks.simular_dia(llegadas=llegadas)
+    eventos = clase(seed=seed, tiempo_exacto=True)
+    eventos.simular_dia_eventos(llegadas=llegadas)
+    assert resumen(eventos) == resumen(ticks)